@@ -8,13 +8,16 @@ Supports natural language processing for task creation, updates, deletion, and f
 from langgraph.graph import StateGraph, END, START
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph.message import MessagesState
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.tools import tool
-from typing import TypedDict, List, Dict, Any, Optional
+from langchain_core.tools import StructuredTool
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from pydantic import BaseModel, Field
+from typing import TypedDict, List, Dict, Any, Optional, Tuple, AsyncIterator
+import asyncio
 import re
 import os
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timezone
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -22,9 +25,13 @@ from pathlib import Path
 # Try relative import first (package context), then absolute as fallback
 try:
     from .task_tools import create_task, update_task, delete_task, list_tasks, filter_tasks
+    from .database import get_tasks_version
+    from .cache import TTLCache, tasks_generation
 except Exception:
     try:
         from task_tools import create_task, update_task, delete_task, list_tasks, filter_tasks
+        from database import get_tasks_version
+        from cache import TTLCache, tasks_generation
     except Exception as import_error:
         # If both imports fail, surface a clear error instead of using non-persistent stubs
         raise RuntimeError(
@@ -49,11 +56,231 @@ For task creation:
 
 Always respond with friendly, natural language and appropriate emojis."""
 
+def _get_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat()
+
 class AgentState(TypedDict):
     """State structure for the agent workflow"""
     messages: List[Dict[str, str]]
     current_task: Dict[str, Any]
     user_preferences: Dict[str, Any]
+    # Timestamp shared by all messages produced for this request
+    now: str
+    # Filled in by the pipeline stages
+    user_input_lower: str
+    intent: str
+    is_create_likely: bool
+    action_result: Dict[str, Any]
+
+def _compile(pattern: str, ignore_case: bool = True):
+    """Compile a pattern once at import time.
+
+    Patterns compiled with ignore_case=False are matched against lowercased input.
+    """
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+class _KeywordAutomaton:
+    """Aho-Corasick automaton reporting the best-ranked keyword found in a single pass.
+
+    Keywords are plain substrings, matching the semantics of ``keyword in text``;
+    best_word_rank() additionally requires each keyword to appear as a whole word.
+    Each keyword carries a rank; lower ranks take precedence.
+    """
+
+    def __init__(self, ranked_keywords: List[List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._rank: List[Optional[int]] = [None]
+        # (keyword length, rank) for every keyword ending at each node
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+        for rank, keywords in enumerate(ranked_keywords):
+            for keyword in keywords:
+                node = 0
+                for ch in keyword:
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._rank.append(None)
+                        self._out.append([])
+                    node = nxt
+                if self._rank[node] is None or rank < self._rank[node]:
+                    self._rank[node] = rank
+                    self._out[node] = [(len(keyword), rank)]
+
+        # Breadth-first construction of failure links; each node inherits the best
+        # rank and the outputs reachable through its suffix chain so lookups never
+        # walk the chain.
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._rank[self._fail[child]]
+                if inherited is not None and (self._rank[child] is None or inherited < self._rank[child]):
+                    self._rank[child] = inherited
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def best_rank(self, text: str) -> Optional[int]:
+        """Return the lowest rank of any keyword occurring in text, or None"""
+        goto, fail, ranks = self._goto, self._fail, self._rank
+        best = None
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            rank = ranks[node]
+            if rank is not None and (best is None or rank < best):
+                if rank == 0:
+                    return 0
+                best = rank
+        return best
+
+    def best_word_rank(self, text: str) -> Optional[int]:
+        """Return the lowest rank of any keyword occurring as a whole word in text"""
+        goto, fail, outputs = self._goto, self._fail, self._out
+        best = None
+        node = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not outputs[node] or (i < last and _is_word_char(text[i + 1])):
+                continue
+            for length, rank in outputs[node]:
+                if best is not None and rank >= best:
+                    continue
+                start = i - length + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    if rank == 0:
+                        return 0
+                    best = rank
+        return best
+
+# Precompiled patterns used by TextProcessor (compiled once at import time)
+_TITLE_PATTERNS = [_compile(p) for p in [
+    r'add a task:\s*(.+?)(?:\s+(?:by|due|tomorrow|today|next week|priority|description)|$)',
+    r'finish (.+?)\s+by\s+(.+?)(?:\s|$)',
+    r'remind me to (.+?)(?:\s+(?:tomorrow|today|next week|due|priority|description)|$)',
+    r'(?:i\s+)?(?:have|need|must|should|want)\s+to\s+(.+?)(?:\s+(?:by|due|tomorrow|today|next week|priority|description)|$)',
+    r'task:\s*(.+?)(?:\s+(?:description|due|priority)|$)',
+    r'create a task (?:called|named|to)?\s*(.+?)(?:\s+(?:description|due|priority)|$)',
+    r'buy (.+?)(?:\s+(?:tomorrow|today|next week|due|priority|description)|$)'
+]]
+
+_DESCRIPTION_RE = _compile(r'description:\s*(.+?)(?:\s+(?:due|priority)|$)')
+
+# Day names mapping
+_DAY_MAP = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+def _day_offset(current_day: int, target_day: int) -> int:
+    """Days until the next target weekday (1-7; the same weekday means next week)"""
+    days_ahead = target_day - current_day
+    return days_ahead + 7 if days_ahead <= 0 else days_ahead
+
+def _iso_after(today: int, days: int) -> str:
+    """Format the date `days` after the `today` ordinal as YYYY-MM-DD"""
+    return date.fromordinal(today + days).isoformat()
+
+# Extractors receive the match and today's date ordinal, read once per extraction
+_DUE_PATTERNS = [(_compile(p, ignore_case=False), fn) for p, fn in [
+    (r'by\s+(friday|monday|tuesday|wednesday|thursday|saturday|sunday)',
+     lambda m, today: TextProcessor._get_date_for_day(m.group(1), _DAY_MAP, today)),
+    (r'by\s+tomorrow', lambda m, today: _iso_after(today, 1)),
+    (r'tomorrow', lambda m, today: _iso_after(today, 1)),
+    (r'today', lambda m, today: _iso_after(today, 0)),
+    (r'next week', lambda m, today: _iso_after(today, 7)),
+    (r'(\d{4}-\d{2}-\d{2})', lambda m, today: m.group(1)),
+    (r'(\d{1,2}/\d{1,2}/\d{4})', lambda m, today: m.group(1))
+]]
+
+_TIME_HM_RE = _compile(r'(?:at|by)?\s*(\d{1,2}):(\d{2})\s*(am|pm)?', ignore_case=False)
+_TIME_H_RE = _compile(r'(?:at|by)?\s*(\d{1,2})\s*(am|pm)', ignore_case=False)
+
+# Cheap substring gates: an extractor returns early unless one of these occurs
+_DUE_HINTS = ("by", "tomorrow", "today", "next week", "-", "/")
+_TIME_HINTS = (":", "am", "pm", "morning", "afternoon", "evening", "night")
+
+# Keyword maps are ordered by precedence: the first entry present in the input wins.
+# Each map is matched by one automaton pass ranked by map order.
+_PART_OF_DAY_MAP = {
+    'morning': '09:00',
+    'afternoon': '15:00',
+    'evening': '18:00',
+    'night': '20:00'
+}
+
+_PRIORITY_MAP = {
+    'urgent': 'urgent', 'high': 'high', 'medium': 'medium', 'low': 'low',
+    'important': 'high', 'critical': 'urgent'
+}
+
+_STATUS_MAP = {
+    'done': 'completed', 'completed': 'completed', 'finished': 'completed',
+    'in progress': 'in_progress', 'started': 'in_progress', 'pending': 'pending',
+    'cancelled': 'cancelled', 'canceled': 'cancelled'
+}
+
+def _keyword_matcher(keyword_map: Dict[str, str]) -> Tuple[_KeywordAutomaton, Tuple[str, ...]]:
+    """Build an automaton ranked by map order plus the values indexed by rank"""
+    return _KeywordAutomaton([[k] for k in keyword_map]), tuple(keyword_map.values())
+
+_PART_OF_DAY_MATCHER = _keyword_matcher(_PART_OF_DAY_MAP)
+_PRIORITY_MATCHER = _keyword_matcher(_PRIORITY_MAP)
+_STATUS_MATCHER = _keyword_matcher(_STATUS_MAP)
+
+_TASK_ID_RE = _compile(r'task\s*#?(\d+)', ignore_case=False)
+_TASK_TITLE_RE = _compile(r'(?:the\s+)?task\s+(.+?)(?:\s+(?:as|to|is)|$)')
+
+# All slot patterns in one scan. Every alternative sits inside a lookahead, so the
+# scan yields a (zero-width) match at each position where any slot matches and
+# overlapping hits are not consumed; slot precedence is resolved afterwards.
+_SLOT_RE = re.compile(r'''(?=
+      by\s+(?P<by_day>monday|tuesday|wednesday|thursday|friday|saturday|sunday)
+    | (?P<tomorrow>tomorrow)
+    | (?P<today>today)
+    | (?P<next_week>next\ week)
+    | (?P<iso_date>\d{4}-\d{2}-\d{2})
+    | (?P<us_date>\d{1,2}/\d{1,2}/\d{4})
+    | (?P<time_hm>(?P<hm_hour>\d{1,2}):(?P<hm_minute>\d{2})\s*(?P<hm_mer>am|pm)?)
+    | (?P<time_h>(?P<h_hour>\d{1,2})\s*(?P<h_mer>am|pm))
+    | \b(?P<part>morning|afternoon|evening|night)\b
+    | \b(?P<priority>urgent|high|medium|low|important|critical)\b
+    | \b(?P<status>done|completed|finished|in\ progress|started|pending|cancelled|canceled)\b
+    | description:\s*(?P<description>.+?)(?:\s+(?:due|priority)|$)
+)''', re.IGNORECASE | re.VERBOSE)
+
+# Due date slots in precedence order (matches extract_due_date's pattern order)
+_DUE_SLOTS = ("by_day", "tomorrow", "today", "next_week", "iso_date", "us_date")
+
+def _to_24h(hour: int, mer: Optional[str]) -> int:
+    if mer == 'pm' and hour < 12:
+        hour += 12
+    if mer == 'am' and hour == 12:
+        hour = 0
+    return hour
+
+def _first_keyword(matcher: Tuple[_KeywordAutomaton, Tuple[str, ...]], user_input_lower: str) -> Optional[str]:
+    """Return the mapped value of the highest-precedence keyword in lowercased input"""
+    automaton, values = matcher
+    rank = automaton.best_word_rank(user_input_lower)
+    return values[rank] if rank is not None else None
 
 class TextProcessor:
     """Utility class for processing natural language text"""
@@ -61,18 +288,8 @@ class TextProcessor:
     @staticmethod
     def extract_title(user_input: str) -> str:
         """Extract task title from user input"""
-        patterns = [
-            r'add a task:\s*(.+?)(?:\s+(?:by|due|tomorrow|today|next week|priority|description)|$)',
-            r'finish (.+?)\s+by\s+(.+?)(?:\s|$)',
-            r'remind me to (.+?)(?:\s+(?:tomorrow|today|next week|due|priority|description)|$)',
-            r'(?:i\s+)?(?:have|need|must|should|want)\s+to\s+(.+?)(?:\s+(?:by|due|tomorrow|today|next week|priority|description)|$)',
-            r'task:\s*(.+?)(?:\s+(?:description|due|priority)|$)',
-            r'create a task (?:called|named|to)?\s*(.+?)(?:\s+(?:description|due|priority)|$)',
-            r'buy (.+?)(?:\s+(?:tomorrow|today|next week|due|priority|description)|$)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _TITLE_PATTERNS:
+            match = pattern.search(user_input)
             if match:
                 return match.group(1).strip()
         
@@ -83,128 +300,170 @@ class TextProcessor:
         return user_input
     
     @staticmethod
-    def extract_description(user_input: str) -> Optional[str]:
+    def extract_description(user_input: str, user_input_lower: str) -> Optional[str]:
         """Extract task description from user input"""
-        match = re.search(r'description:\s*(.+?)(?:\s+(?:due|priority)|$)', user_input, re.IGNORECASE)
+        if "description:" not in user_input_lower:
+            return None
+        match = _DESCRIPTION_RE.search(user_input)
         return match.group(1).strip() if match else None
     
     @staticmethod
-    def extract_due_date(user_input: str) -> Optional[str]:
-        """Extract due date from user input"""
-        # Day names mapping
-        day_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        
-        # Look for specific patterns
-        patterns = [
-            (r'by\s+(friday|monday|tuesday|wednesday|thursday|saturday|sunday)', 
-             lambda m: TextProcessor._get_date_for_day(m.group(1).lower(), day_map)),
-            (r'by\s+tomorrow', lambda m: (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')),
-            (r'tomorrow', lambda m: (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')),
-            (r'today', lambda m: datetime.now().strftime('%Y-%m-%d')),
-            (r'next week', lambda m: (datetime.now() + timedelta(weeks=1)).strftime('%Y-%m-%d')),
-            (r'(\d{4}-\d{2}-\d{2})', lambda m: m.group(1)),
-            (r'(\d{1,2}/\d{1,2}/\d{4})', lambda m: m.group(1))
-        ]
-        
-        for pattern, extractor in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+    def extract_due_date(user_input_lower: str) -> Optional[str]:
+        """Extract due date from lowercased user input"""
+        if not any(hint in user_input_lower for hint in _DUE_HINTS):
+            return None
+        for pattern, extractor in _DUE_PATTERNS:
+            match = pattern.search(user_input_lower)
             if match:
-                return extractor(match)
+                return extractor(match, date.today().toordinal())
         
         return None
 
     @staticmethod
-    def extract_time(user_input: str) -> Optional[str]:
-        """Extract time (HH:MM 24h) from user input. Supports patterns like 'at 7pm', 'by 19:30', 'tomorrow morning'."""
+    def extract_time(user_input_lower: str) -> Optional[str]:
+        """Extract time (HH:MM 24h) from lowercased user input. Supports patterns like 'at 7pm', 'by 19:30', 'tomorrow morning'."""
+        if not any(hint in user_input_lower for hint in _TIME_HINTS):
+            return None
         # Explicit HH:MM
-        m = re.search(r'(?:at|by)?\s*(\d{1,2}):(\d{2})\s*(am|pm)?', user_input, re.IGNORECASE)
+        m = _TIME_HM_RE.search(user_input_lower)
         if m:
-            hour = int(m.group(1))
-            minute = int(m.group(2))
-            mer = m.group(3).lower() if m.group(3) else None
-            if mer == 'pm' and hour < 12:
-                hour += 12
-            if mer == 'am' and hour == 12:
-                hour = 0
-            return f"{hour:02d}:{minute:02d}"
+            return f"{_to_24h(int(m.group(1)), m.group(3)):02d}:{int(m.group(2)):02d}"
         # Hour with am/pm
-        m = re.search(r'(?:at|by)?\s*(\d{1,2})\s*(am|pm)', user_input, re.IGNORECASE)
+        m = _TIME_H_RE.search(user_input_lower)
         if m:
-            hour = int(m.group(1))
-            mer = m.group(2).lower()
-            if mer == 'pm' and hour < 12:
-                hour += 12
-            if mer == 'am' and hour == 12:
-                hour = 0
-            return f"{hour:02d}:00"
+            return f"{_to_24h(int(m.group(1)), m.group(2)):02d}:00"
         # Parts of day
-        part_map = {
-            'morning': '09:00',
-            'afternoon': '15:00',
-            'evening': '18:00',
-            'night': '20:00'
-        }
-        for k, v in part_map.items():
-            if re.search(rf'\b{k}\b', user_input, re.IGNORECASE):
-                return v
-        return None
+        return _first_keyword(_PART_OF_DAY_MATCHER, user_input_lower)
     
     @staticmethod
-    def _get_date_for_day(day_name: str, day_map: Dict[str, int]) -> str:
-        """Calculate date for a given day name"""
-        target_day = day_map[day_name]
-        today = datetime.now()
-        current_day = today.weekday()
-        days_ahead = target_day - current_day
-        if days_ahead <= 0:
-            days_ahead += 7
-        target_date = today + timedelta(days=days_ahead)
-        return target_date.strftime('%Y-%m-%d')
+    def _get_date_for_day(day_name: str, day_map: Dict[str, int], today: Optional[int] = None) -> str:
+        """Calculate date for a given day name, optionally relative to a date ordinal"""
+        if today is None:
+            today = date.today().toordinal()
+        # Ordinal 1 (0001-01-01) was a Monday, matching weekday() numbering
+        current_day = (today - 1) % 7
+        return _iso_after(today, _day_offset(current_day, day_map[day_name]))
     
     @staticmethod
-    def extract_priority(user_input: str) -> str:
-        """Extract priority from user input"""
-        priority_map = {
-            'urgent': 'urgent', 'high': 'high', 'medium': 'medium', 'low': 'low',
-            'important': 'high', 'critical': 'urgent'
-        }
-        
-        for keyword, priority in priority_map.items():
-            if re.search(rf'\b{keyword}\b', user_input, re.IGNORECASE):
-                return priority
-        
-        return "medium"
+    def extract_priority(user_input_lower: str) -> str:
+        """Extract priority from lowercased user input"""
+        return _first_keyword(_PRIORITY_MATCHER, user_input_lower) or "medium"
     
     @staticmethod
-    def extract_status(user_input: str) -> Optional[str]:
-        """Extract status from user input"""
-        status_map = {
-            'done': 'completed', 'completed': 'completed', 'finished': 'completed',
-            'in progress': 'in_progress', 'started': 'in_progress', 'pending': 'pending',
-            'cancelled': 'cancelled', 'canceled': 'cancelled'
-        }
-        
-        for keyword, status in status_map.items():
-            if re.search(rf'\b{keyword}\b', user_input, re.IGNORECASE):
-                return status
-        
-        return None
+    def extract_status(user_input_lower: str) -> Optional[str]:
+        """Extract status from lowercased user input"""
+        return _first_keyword(_STATUS_MATCHER, user_input_lower)
     
     @staticmethod
-    def extract_task_id(user_input: str) -> Optional[int]:
-        """Extract task ID from user input"""
-        match = re.search(r'task\s*#?(\d+)', user_input, re.IGNORECASE)
+    def extract_task_id(user_input_lower: str) -> Optional[int]:
+        """Extract task ID from lowercased user input"""
+        if "task" not in user_input_lower:
+            return None
+        match = _TASK_ID_RE.search(user_input_lower)
         return int(match.group(1)) if match else None
     
     @staticmethod
-    def extract_task_title(user_input: str) -> Optional[str]:
+    def extract_task_title(user_input: str, user_input_lower: str) -> Optional[str]:
         """Extract task title for matching from user input"""
-        match = re.search(r'(?:the\s+)?task\s+(.+?)(?:\s+(?:as|to|is)|$)', user_input, re.IGNORECASE)
+        if "task" not in user_input_lower:
+            return None
+        match = _TASK_TITLE_RE.search(user_input)
         return match.group(1).strip() if match else None
 
+    @staticmethod
+    def extract_slots(user_input: str) -> Dict[str, Any]:
+        """Extract description, due date, time, priority and status in a single scan.
+
+        Returns the same values as the individual extract_* methods.
+        """
+        first: Dict[str, re.Match] = {}
+        keywords: Dict[str, set] = {"part": set(), "priority": set(), "status": set()}
+        for m in _SLOT_RE.finditer(user_input):
+            # lastgroup is the outermost named group of the alternative that matched
+            slot = m.lastgroup
+            if slot in keywords:
+                keywords[slot].add(m.group(slot).lower())
+            elif slot not in first:
+                first[slot] = m
+
+        due_date = None
+        for slot in _DUE_SLOTS:
+            m = first.get(slot)
+            if m is None:
+                continue
+            today = date.today().toordinal()
+            if slot == "by_day":
+                due_date = TextProcessor._get_date_for_day(m.group(slot).lower(), _DAY_MAP, today)
+            elif slot == "tomorrow":
+                due_date = _iso_after(today, 1)
+            elif slot == "today":
+                due_date = _iso_after(today, 0)
+            elif slot == "next_week":
+                due_date = _iso_after(today, 7)
+            else:
+                due_date = m.group(slot)
+            break
+
+        time_hint = None
+        if "time_hm" in first:
+            m = first["time_hm"]
+            mer = m.group("hm_mer").lower() if m.group("hm_mer") else None
+            time_hint = f"{_to_24h(int(m.group('hm_hour')), mer):02d}:{int(m.group('hm_minute')):02d}"
+        elif "time_h" in first:
+            m = first["time_h"]
+            time_hint = f"{_to_24h(int(m.group('h_hour')), m.group('h_mer').lower()):02d}:00"
+        else:
+            time_hint = next((v for k, v in _PART_OF_DAY_MAP.items() if k in keywords["part"]), None)
+
+        description = first.get("description")
+        return {
+            "description": description.group("description").strip() if description else None,
+            "due_date": due_date,
+            "time": time_hint,
+            "priority": next((v for k, v in _PRIORITY_MAP.items() if k in keywords["priority"]), "medium"),
+            "status": next((v for k, v in _STATUS_MAP.items() if k in keywords["status"]), None),
+        }
+
+# Intent keywords in precedence order (earlier intents win when several match)
+_INTENT_PATTERNS = {
+    "create": [
+        "create", "add", "new", "make", "finish", "complete", "do", "plan", "schedule",
+        "remind me to", "i have to", "have to", "need to", "must", "should", "want to",
+        "i want", "i need", "i should", "i must", "i have", "i will", "i'm going to"
+    ],
+    "update": ["update", "change", "modify", "edit", "mark", "done", "complete", "finish"],
+    "delete": ["delete", "remove", "cancel", "drop", "erase"],
+    "list": ["list", "show", "display", "get all", "what are", "what's my", "my tasks"],
+    "filter": ["filter", "find", "search", "look for", "high priority", "urgent", "pending", "completed"]
+}
+_INTENTS = list(_INTENT_PATTERNS)
+
+# Words that suggest a task should be created when no intent was classified
+_CREATE_INDICATORS = [
+    "add", "create", "new", "finish", "complete", "do", "task", "plan", "schedule",
+    "remind me to", "i have to", "have to", "need to", "must", "should", "want to",
+    "i want", "i need", "i should", "i must", "i have", "i will", "i'm going to",
+    "tomorrow", "today", "next week", "this week", "play", "eat", "buy", "call", "visit"
+]
+
+# The create indicators rank below every intent, so one pass both classifies the
+# intent and tells whether a "general" message still looks like a new task.
+_CREATE_INDICATOR_RANK = len(_INTENTS)
+_INTENT_AUTOMATON = _KeywordAutomaton([*_INTENT_PATTERNS.values(), _CREATE_INDICATORS])
+
+def _scan_intent(user_input: str) -> Tuple[str, bool]:
+    """Return (intent, is_create_likely) for already-lowercased input"""
+    rank = _INTENT_AUTOMATON.best_rank(user_input)
+    if rank is None:
+        return "general", False
+    if rank == _CREATE_INDICATOR_RANK:
+        return "general", True
+    return _INTENTS[rank], True
+
+def _classify_intent(user_input: str) -> str:
+    """Return the highest-precedence intent for already-lowercased input"""
+    return _scan_intent(user_input)[0]
+
 class IntentHandler:
     """Handles intent classification and task actions"""
     
@@ -216,27 +475,14 @@ class IntentHandler:
             return state
         
         last_message = messages[-1]
-        user_input = last_message.get("content", "").lower()
-        
-        # Enhanced intent classification with more patterns
-        intent_patterns = {
-            "create": [
-                "create", "add", "new", "make", "finish", "complete", "do", "plan", "schedule",
-                "remind me to", "i have to", "have to", "need to", "must", "should", "want to",
-                "i want", "i need", "i should", "i must", "i have", "i will", "i'm going to"
-            ],
-            "update": ["update", "change", "modify", "edit", "mark", "done", "complete", "finish"],
-            "delete": ["delete", "remove", "cancel", "drop", "erase"],
-            "list": ["list", "show", "display", "get all", "what are", "what's my", "my tasks"],
-            "filter": ["filter", "find", "search", "look for", "high priority", "urgent", "pending", "completed"]
-        }
+        # Lowercase once; the case-insensitive extractors in later stages take
+        # this string, only title and description extraction need the original
+        user_input_lower = last_message.get("content", "").lower()
+        state["user_input_lower"] = user_input_lower
         
-        for intent, patterns in intent_patterns.items():
-            if any(pattern in user_input for pattern in patterns):
-                state["intent"] = intent
-                return state
-        
-        state["intent"] = "general"
+        # Single pass over the input finds the highest-precedence intent keyword
+        # and whether an unclassified message should still create a task
+        state["intent"], state["is_create_likely"] = _scan_intent(user_input_lower)
         return state
 
     @staticmethod
@@ -246,28 +492,27 @@ class IntentHandler:
         messages = state["messages"]
         last_message = messages[-1] if messages else {"content": ""}
         user_input = last_message.get("content", "")
+        user_input_lower = state.get("user_input_lower")
+        if user_input_lower is None:
+            user_input_lower = user_input.lower()
         
         try:
             if intent == "create":
                 result = IntentHandler._create_task_from_input(user_input)
             elif intent == "update":
-                result = IntentHandler._update_task_from_input(user_input)
+                result = IntentHandler._update_task_from_input(user_input, user_input_lower)
             elif intent == "delete":
-                result = IntentHandler._delete_task_from_input(user_input)
+                result = IntentHandler._delete_task_from_input(user_input, user_input_lower)
             elif intent == "list":
                 result = list_tasks()
             elif intent == "filter":
-                result = IntentHandler._filter_tasks_from_input(user_input)
+                result = IntentHandler._filter_tasks_from_input(user_input_lower)
             else:
-                # Enhanced detection for create intent
-                create_indicators = [
-                    "add", "create", "new", "finish", "complete", "do", "task", "plan", "schedule",
-                    "remind me to", "i have to", "have to", "need to", "must", "should", "want to",
-                    "i want", "i need", "i should", "i must", "i have", "i will", "i'm going to",
-                    "tomorrow", "today", "next week", "this week", "play", "eat", "buy", "call", "visit"
-                ]
-                
-                if any(word in user_input.lower() for word in create_indicators):
+                # Enhanced detection for create intent, decided in parse_user_intent
+                is_create_likely = state.get("is_create_likely")
+                if is_create_likely is None:
+                    is_create_likely = _scan_intent(user_input_lower)[1]
+                if is_create_likely:
                     result = IntentHandler._create_task_from_input(user_input)
                 else:
                     result = {
@@ -286,50 +531,44 @@ class IntentHandler:
         if not title:
             return {"error": "I'd be happy to help you create a task! 😊\n\nCould you please tell me what you'd like to do? For example:\n• 'Buy groceries tomorrow'\n• 'Call the dentist next week'\n• 'Finish the report by Friday'"}
         
-        description = TextProcessor.extract_description(user_input)
-        due_date = TextProcessor.extract_due_date(user_input)
-        time_hint = TextProcessor.extract_time(user_input)
-        priority = TextProcessor.extract_priority(user_input)
+        slots = TextProcessor.extract_slots(user_input)
         
         return create_task(
             title=title,
-            description=description,
-            due_date=due_date,
-            priority=priority,
-            time_hint=time_hint
+            description=slots["description"],
+            due_date=slots["due_date"],
+            priority=slots["priority"],
+            time_hint=slots["time"]
         )
 
     @staticmethod
-    def _update_task_from_input(user_input: str) -> Dict[str, Any]:
+    def _update_task_from_input(user_input: str, user_input_lower: str) -> Dict[str, Any]:
         """Extract update details from user input and update task"""
-        task_id = TextProcessor.extract_task_id(user_input)
-        title_match = TextProcessor.extract_task_title(user_input)
+        task_id = TextProcessor.extract_task_id(user_input_lower)
+        title_match = TextProcessor.extract_task_title(user_input, user_input_lower)
         
         if not task_id and not title_match:
             return {"error": "I can help you update a task! 😊\n\nPlease tell me which task to update:\n• 'Mark task 1 as completed'\n• 'Update the grocery task to high priority'\n• 'Change task 2 to due tomorrow'"}
         
         # Extract update fields
         new_title = TextProcessor.extract_title(user_input)
-        new_description = TextProcessor.extract_description(user_input)
-        new_status = TextProcessor.extract_status(user_input)
-        new_due_date = TextProcessor.extract_due_date(user_input)
-        new_priority = TextProcessor.extract_priority(user_input)
+        slots = TextProcessor.extract_slots(user_input)
         
         return update_task(
             task_id=task_id,
             title_match=title_match,
             title=new_title,
-            description=new_description,
-            status=new_status,
-            due_date=new_due_date,
-            priority=new_priority
+            description=slots["description"],
+            status=slots["status"],
+            due_date=slots["due_date"],
+            priority=slots["priority"]
         )
 
     @staticmethod
-    def _delete_task_from_input(user_input: str) -> Dict[str, Any]:
+    def _delete_task_from_input(user_input: str, user_input_lower: str) -> Dict[str, Any]:
         """Extract task identifier from user input and delete task"""
-        task_id = TextProcessor.extract_task_id(user_input)
-        title_match = TextProcessor.extract_task_title(user_input)
+        task_id = TextProcessor.extract_task_id(user_input_lower)
+        title_match = TextProcessor.extract_task_title(user_input, user_input_lower)
         
         if not task_id and not title_match:
             return {"error": "I can help you delete a task! 😊\n\nPlease tell me which task to delete:\n• 'Delete task 1'\n• 'Remove the grocery task'\n• 'Cancel the dentist appointment'"}
@@ -337,11 +576,11 @@ class IntentHandler:
         return delete_task(task_id=task_id, title_match=title_match)
 
     @staticmethod
-    def _filter_tasks_from_input(user_input: str) -> Dict[str, Any]:
-        """Extract filter criteria from user input and filter tasks"""
-        status = TextProcessor.extract_status(user_input)
-        priority = TextProcessor.extract_priority(user_input)
-        due_date = TextProcessor.extract_due_date(user_input)
+    def _filter_tasks_from_input(user_input_lower: str) -> Dict[str, Any]:
+        """Extract filter criteria from lowercased user input and filter tasks"""
+        status = TextProcessor.extract_status(user_input_lower)
+        priority = TextProcessor.extract_priority(user_input_lower)
+        due_date = TextProcessor.extract_due_date(user_input_lower)
         
         return filter_tasks(
             status=status,
@@ -349,6 +588,14 @@ class IntentHandler:
             due_date_from=due_date
         )
 
+# Bound format methods for task list rows, built once instead of per-row f-strings
+_TASK_ROW_FORMAT = "• {title} (ID: {id}, Status: {status}, Priority: {priority})\n".format_map
+_TASK_DUE_FORMAT = "  📅 Due: {due_date}\n".format_map
+
+def _format_task_row(task: Dict[str, Any]) -> str:
+    row = _TASK_ROW_FORMAT(task)
+    return row + _TASK_DUE_FORMAT(task) if task.get('due_date') else row
+
 class ResponseGenerator:
     """Generates natural language responses based on action results"""
     
@@ -360,29 +607,28 @@ class ResponseGenerator:
         
         if action_result.get("error"):
             response = action_result["error"]
+        elif "tasks" in action_result:
+            tasks = action_result["tasks"]
+            if tasks:
+                response = f"📝 Found {len(tasks)} task(s):\n\n" + "".join(map(_format_task_row, tasks))
+            else:
+                response = "No tasks found matching your criteria. 🤷‍♂️"
         elif action_result.get("success"):
-            response = action_result.get("message", "Action completed successfully! ✅")
+            parts = [action_result.get("message", "Action completed successfully! ✅")]
             
             # Add task details if available
             if "task" in action_result:
                 task = action_result["task"]
-                response += f"\n\n📋 Task Details:\n"
-                response += f"• ID: {task['id']}\n"
-                response += f"• Title: {task['title']}\n"
-                response += f"• Status: {task['status']}\n"
-                response += f"• Priority: {task['priority']}\n"
+                parts.append(
+                    f"\n\n📋 Task Details:\n"
+                    f"• ID: {task['id']}\n"
+                    f"• Title: {task['title']}\n"
+                    f"• Status: {task['status']}\n"
+                    f"• Priority: {task['priority']}\n"
+                )
                 if task.get('due_date'):
-                    response += f"• Due Date: {task['due_date']}\n"
-        elif "tasks" in action_result:
-            tasks = action_result["tasks"]
-            if tasks:
-                response = f"📝 Found {len(tasks)} task(s):\n\n"
-                for task in tasks:
-                    response += f"• {task['title']} (ID: {task['id']}, Status: {task['status']}, Priority: {task['priority']})\n"
-                    if task.get('due_date'):
-                        response += f"  📅 Due: {task['due_date']}\n"
-            else:
-                response = "No tasks found matching your criteria. 🤷‍♂️"
+                    parts.append(f"• Due Date: {task['due_date']}\n")
+            response = "".join(parts)
         else:
             response = action_result.get("message", "I'm here to help you manage your tasks! 😊")
         
@@ -390,43 +636,76 @@ class ResponseGenerator:
         messages.append({
             "role": "assistant",
             "content": response,
-            "timestamp": str(datetime.utcnow())
+            "timestamp": state.get("now") or _get_now_iso()
         })
         
         state["messages"] = messages
         return state
 
-# Tools for LLM tool-calling
-@tool("create_task")
-def create_task_tool(title: str, description: Optional[str] = None, 
-                    due_date: Optional[str] = None, priority: str = "medium") -> Dict[str, Any]:
-    """Add a new task. Provide title (required), optional description, due_date (YYYY-MM-DD), and priority (low|medium|high|urgent)."""
-    return create_task(title=title, description=description, due_date=due_date, priority=priority)
-
-@tool("update_task")
-def update_task_tool(task_id: Optional[int] = None, title_match: Optional[str] = None, 
-                    title: Optional[str] = None, description: Optional[str] = None, 
-                    status: Optional[str] = None, due_date: Optional[str] = None, 
-                    priority: Optional[str] = None) -> Dict[str, Any]:
-    """Modify a task by id or matching title. You can change title, description, status, due_date, or priority. Provide either task_id or title_match."""
-    return update_task(task_id=task_id, title_match=title_match, title=title, 
-                      description=description, status=status, due_date=due_date, priority=priority)
-
-@tool("delete_task")
-def delete_task_tool(task_id: Optional[int] = None, title_match: Optional[str] = None) -> Dict[str, Any]:
-    """Delete a task by id or approximate title."""
-    return delete_task(task_id=task_id, title_match=title_match)
-
-@tool("list_tasks")
-def list_tasks_tool() -> Dict[str, Any]:
-    """Return all tasks."""
-    return list_tasks()
-
-@tool("filter_tasks")
-def filter_tasks_tool(status: Optional[str] = None, priority: Optional[str] = None, 
-                     due_date_from: Optional[str] = None, due_date_to: Optional[str] = None) -> Dict[str, Any]:
-    """Filter tasks by status, priority, or due date range."""
-    return filter_tasks(status=status, priority=priority, due_date_from=due_date_from, due_date_to=due_date_to)
+# Tools for LLM tool-calling: argument schemas are declared once and the task
+# functions are bound directly, without pass-through wrappers
+class CreateTaskArgs(BaseModel):
+    title: str = Field(description="The task title")
+    description: Optional[str] = Field(None, description="Optional task description")
+    due_date: Optional[str] = Field(None, description="Due date in YYYY-MM-DD format")
+    priority: str = Field("medium", description="Task priority (low|medium|high|urgent)")
+
+class UpdateTaskArgs(BaseModel):
+    task_id: Optional[int] = Field(None, description="ID of the task to update")
+    title_match: Optional[str] = Field(None, description="Title to match when no ID is given")
+    title: Optional[str] = Field(None, description="New title")
+    description: Optional[str] = Field(None, description="New description")
+    status: Optional[str] = Field(None, description="New status (pending|in_progress|completed|cancelled)")
+    due_date: Optional[str] = Field(None, description="New due date in YYYY-MM-DD format")
+    priority: Optional[str] = Field(None, description="New priority (low|medium|high|urgent)")
+
+class DeleteTaskArgs(BaseModel):
+    task_id: Optional[int] = Field(None, description="ID of the task to delete")
+    title_match: Optional[str] = Field(None, description="Approximate title when no ID is given")
+
+class ListTasksArgs(BaseModel):
+    pass
+
+class FilterTasksArgs(BaseModel):
+    status: Optional[str] = Field(None, description="Status (pending|in_progress|completed|cancelled)")
+    priority: Optional[str] = Field(None, description="Priority (low|medium|high|urgent)")
+    due_date_from: Optional[str] = Field(None, description="Earliest due date (ISO format)")
+    due_date_to: Optional[str] = Field(None, description="Latest due date (ISO format)")
+
+create_task_tool = StructuredTool.from_function(
+    func=create_task,
+    name="create_task",
+    description="Add a new task. Provide title (required), optional description, due_date (YYYY-MM-DD), and priority (low|medium|high|urgent).",
+    args_schema=CreateTaskArgs,
+)
+
+update_task_tool = StructuredTool.from_function(
+    func=update_task,
+    name="update_task",
+    description="Modify a task by id or matching title. You can change title, description, status, due_date, or priority. Provide either task_id or title_match.",
+    args_schema=UpdateTaskArgs,
+)
+
+delete_task_tool = StructuredTool.from_function(
+    func=delete_task,
+    name="delete_task",
+    description="Delete a task by id or approximate title.",
+    args_schema=DeleteTaskArgs,
+)
+
+list_tasks_tool = StructuredTool.from_function(
+    func=list_tasks,
+    name="list_tasks",
+    description="Return all tasks.",
+    args_schema=ListTasksArgs,
+)
+
+filter_tasks_tool = StructuredTool.from_function(
+    func=filter_tasks,
+    name="filter_tasks",
+    description="Filter tasks by status, priority, or due date range.",
+    args_schema=FilterTasksArgs,
+)
 
 TOOLS = [create_task_tool, update_task_tool, delete_task_tool, list_tasks_tool, filter_tasks_tool]
 
@@ -448,21 +727,76 @@ def create_deterministic_agent():
     
     return workflow.compile()
 
+def _fast_deterministic(state: AgentState) -> AgentState:
+    """Run the deterministic pipeline as plain function calls.
+
+    The graph built by create_deterministic_agent() is strictly linear, so chaining
+    the node functions directly gives the same result without graph dispatch overhead.
+    """
+    state = IntentHandler.parse_user_intent(state)
+    state = IntentHandler.execute_task_action(state)
+    return ResponseGenerator.generate_response(state)
+
+# Tools that only read; calls to them never depend on each other
+_READ_ONLY_TOOLS = frozenset({"list_tasks", "filter_tasks"})
+
+def _plan_tool_batches(tool_calls: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split one model turn's tool calls into batches that are safe to run concurrently.
+
+    ToolNode runs every call of a batch in parallel. Writes may target the same task
+    and reads in the same turn should observe them, so when writes are present each
+    write gets its own batch, in the order requested, followed by one batch of reads.
+    """
+    writes = [call for call in tool_calls if call["name"] not in _READ_ONLY_TOOLS]
+    if not writes or len(tool_calls) == 1:
+        return [tool_calls]
+    reads = [call for call in tool_calls if call["name"] in _READ_ONLY_TOOLS]
+    return [[call] for call in writes] + ([reads] if reads else [])
+
+def _in_call_order(tool_calls: List[Dict[str, Any]], messages: List[Any]) -> List[Any]:
+    """Order tool results like the calls they answer, as a single ToolNode run would"""
+    position = {call["id"]: index for index, call in enumerate(tool_calls)}
+    return sorted(messages, key=lambda m: position.get(getattr(m, "tool_call_id", None), len(position)))
+
+def create_tool_runner(tools: Optional[List[Any]] = None) -> RunnableLambda:
+    """Create the graph node that executes the model's tool calls"""
+    tool_node = ToolNode(TOOLS if tools is None else tools)
+
+    def _batches(state: MessagesState) -> List[Dict[str, Any]]:
+        message = state["messages"][-1]
+        return [
+            {"messages": [message.model_copy(update={"tool_calls": batch})]}
+            for batch in _plan_tool_batches(message.tool_calls)
+        ]
+
+    def run_tools(state: MessagesState, config: RunnableConfig):
+        messages = []
+        for batch_state in _batches(state):
+            messages.extend(tool_node.invoke(batch_state, config)["messages"])
+        return {"messages": _in_call_order(state["messages"][-1].tool_calls, messages)}
+
+    async def arun_tools(state: MessagesState, config: RunnableConfig):
+        messages = []
+        for batch_state in _batches(state):
+            messages.extend((await tool_node.ainvoke(batch_state, config))["messages"])
+        return {"messages": _in_call_order(state["messages"][-1].tool_calls, messages)}
+
+    return RunnableLambda(run_tools, afunc=arun_tools, name="tools")
+
 def create_llm_tool_agent() -> Any:
     """Create a simple LangGraph of LLM + ToolNode for tool-calling using Gemini.
     Falls back to None if LLM is unavailable."""
-    if llm is None:
+    llm_with_tools = get_llm_with_tools()
+    if llm_with_tools is None:
         return None
 
-    llm_with_tools = llm.bind_tools(TOOLS)
-
     def call_model(state: MessagesState):
         ai_msg = llm_with_tools.invoke(state["messages"])
         return {"messages": [ai_msg]}
 
     graph = StateGraph(MessagesState)
     graph.add_node("llm", call_model)
-    graph.add_node("tools", ToolNode(TOOLS))
+    graph.add_node("tools", create_tool_runner())
     graph.add_edge(START, "llm")
     graph.add_conditional_edges("llm", tools_condition)
     graph.add_edge("tools", "llm")
@@ -484,6 +818,7 @@ def initialize_llm():
 
         gemini_key = os.getenv("GEMINI_API_KEY")
         if gemini_key and gemini_key != "your_gemini_api_key_here":
+            from langchain_google_genai import ChatGoogleGenerativeAI
             return ChatGoogleGenerativeAI(
                 model="gemini-1.5-flash",
                 google_api_key=gemini_key,
@@ -496,70 +831,241 @@ def initialize_llm():
         print(f"Warning: Could not initialize Gemini API: {e}. Using fallback mode.")
         return None
 
-# Create agents
-llm = initialize_llm()
-deterministic_agent = create_deterministic_agent()
-llm_tool_agent = create_llm_tool_agent()
+# Set USE_DETERMINISTIC_GRAPH=true to run the fallback agent through LangGraph
+# instead of the direct function-call pipeline.
+USE_DETERMINISTIC_GRAPH = os.getenv("USE_DETERMINISTIC_GRAPH", "false").lower() == "true"
+
+# Agents are created on first use rather than at import time, so importing this
+# module stays cheap and does not touch the LLM client or its environment.
+_UNSET = object()
+_llm: Any = _UNSET
+_llm_with_tools: Any = _UNSET
+_deterministic_agent: Any = _UNSET
+_llm_tool_agent: Any = _UNSET
+_agent_lock = threading.RLock()
+
+def get_llm():
+    """Return the shared LLM client, or None when the LLM pathway is disabled"""
+    global _llm
+    if _llm is _UNSET:
+        with _agent_lock:
+            if _llm is _UNSET:
+                _llm = initialize_llm()
+    return _llm
+
+def get_llm_with_tools():
+    """Return the shared LLM with TOOLS bound, or None without an LLM"""
+    global _llm_with_tools
+    if _llm_with_tools is _UNSET:
+        with _agent_lock:
+            if _llm_with_tools is _UNSET:
+                llm = get_llm()
+                _llm_with_tools = llm.bind_tools(TOOLS) if llm is not None else None
+    return _llm_with_tools
+
+def get_deterministic_agent():
+    """Return the compiled deterministic agent graph"""
+    global _deterministic_agent
+    if _deterministic_agent is _UNSET:
+        with _agent_lock:
+            if _deterministic_agent is _UNSET:
+                _deterministic_agent = create_deterministic_agent()
+    return _deterministic_agent
+
+def get_llm_tool_agent():
+    """Return the compiled LLM tool-calling agent, or None without an LLM"""
+    global _llm_tool_agent
+    if _llm_tool_agent is _UNSET:
+        with _agent_lock:
+            if _llm_tool_agent is _UNSET:
+                _llm_tool_agent = create_llm_tool_agent()
+    return _llm_tool_agent
+
+# Shared system message; the fixed id keeps LangGraph from assigning one per call
+_SYS_MSG = SystemMessage(content=SYSTEM_PROMPT, id="system-prompt")
+
+def _to_lc_message(role: Optional[str], content: str):
+    return HumanMessage(content=content) if role == "user" else AIMessage(content=content)
+
+class LCHistoryCache:
+    """Per-session cache of conversation history converted to LangChain messages.
+
+    The client resends the full history on every turn; when it extends the history
+    seen on the previous turn only the new messages are converted.
+    """
+
+    def __init__(self):
+        self._key: List[Tuple[Optional[str], str]] = []
+        self._messages: List[Any] = []
+
+    def convert(self, conversation_history: List[Dict[str, str]]) -> List[Any]:
+        key = [(m.get("role"), m.get("content", "")) for m in conversation_history]
+        known = len(self._key)
+        if known <= len(key) and key[:known] == self._key:
+            messages = self._messages + [_to_lc_message(role, content) for role, content in key[known:]]
+        else:
+            messages = [_to_lc_message(role, content) for role, content in key]
+        self._key = key
+        self._messages = messages
+        return messages
+
+# Responses to read-only requests ("show my tasks") are reused until the tasks
+# table changes in this process or, through the shared generation, in any
+# other worker; mutating intents are never cached.
+_CACHEABLE_INTENTS = frozenset({"list", "filter"})
+_response_cache = TTLCache(maxsize=1024, ttl=30)
+
+def _response_cache_key(user_message: str, conversation_history: List[Dict[str, str]]) -> Optional[Tuple]:
+    """Build the cache key for a read-only message, or None if it must not be cached"""
+    normalized = user_message.strip().lower()
+    if _classify_intent(normalized) not in _CACHEABLE_INTENTS:
+        return None
+    generation = tasks_generation.get()
+    if generation is None:
+        return None
+    recent = tuple((m.get("role"), m.get("content")) for m in conversation_history[-4:])
+    return (normalized, recent, get_tasks_version(), generation)
+
+def _cached_response(cache_key: Optional[Tuple], user_message: str,
+                     conversation_history: List[Dict[str, str]], now: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for a read-only message, or None on a miss"""
+    if cache_key is None:
+        return None
+    cached_response = _response_cache.get(cache_key)
+    if cached_response is None:
+        return None
+    conversation_history.append({"role": "user", "content": user_message, "timestamp": now})
+    conversation_history.append({"role": "assistant", "content": cached_response, "timestamp": now})
+    return {"response": cached_response, "conversation_history": conversation_history}
+
+def _build_lc_messages(user_message: str, conversation_history: List[Dict[str, str]],
+                       lc_history_cache: Optional[LCHistoryCache]) -> List[Any]:
+    """Build LangChain chat messages: system + history + user"""
+    if lc_history_cache is None:
+        lc_history = [_to_lc_message(m.get("role"), m.get("content", "")) for m in conversation_history]
+    else:
+        lc_history = lc_history_cache.convert(conversation_history)
+    return [_SYS_MSG, *lc_history, HumanMessage(content=user_message)]
+
+def _llm_result(messages: List[Any], now: str) -> Dict[str, Any]:
+    """Convert the LLM agent's final messages back to simple dicts for the frontend"""
+    final_text = messages[-1].content if messages else ""
+    
+    conv_hist = []
+    for m in messages:
+        if isinstance(m, SystemMessage):
+            continue
+            
+        role = "assistant" if isinstance(m, AIMessage) else "user"
+        
+        # Filter out raw JSON responses and system prompts
+        if role == "assistant" and m.content.startswith('{"success":'):
+            continue
+        if role == "assistant" and "You are an AI-powered task management assistant" in m.content:
+            continue
+            
+        conv_hist.append({
+            "role": role, 
+            "content": m.content, 
+            "timestamp": now
+        })
+    
+    return {"response": final_text, "conversation_history": conv_hist}
 
-def process_user_message(user_message: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+def process_user_message(
+    user_message: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    lc_history_cache: Optional[LCHistoryCache] = None,
+) -> Dict[str, Any]:
     """Process a user message and return the agent's response.
-    Uses Gemini+LangGraph tools when available; otherwise falls back to the regex agent."""
+    Uses Gemini+LangGraph tools when available; otherwise falls back to the regex agent.
+    Pass a per-session LCHistoryCache to avoid re-converting the whole history each turn."""
     if conversation_history is None:
         conversation_history = []
+    now = _get_now_iso()
+    
+    cache_key = _response_cache_key(user_message, conversation_history)
+    cached = _cached_response(cache_key, user_message, conversation_history, now)
+    if cached is not None:
+        return cached
     
     # If LLM tool agent available, route through it
+    llm_tool_agent = get_llm_tool_agent()
     if llm_tool_agent is not None:
-        # Build LangChain chat messages: system + history + user
-        lc_messages = [SystemMessage(content=SYSTEM_PROMPT)]
-        for msg in conversation_history:
-            if msg.get("role") == "user":
-                lc_messages.append(HumanMessage(content=msg.get("content", "")))
-            else:
-                lc_messages.append(AIMessage(content=msg.get("content", "")))
-        lc_messages.append(HumanMessage(content=user_message))
-
-        result = llm_tool_agent.invoke({"messages": lc_messages})
-        
-        # Convert back to simple dict messages for the frontend
-        final_text = result["messages"][-1].content if result.get("messages") else ""
-        
-        conv_hist = []
-        for m in result.get("messages", []):
-            if isinstance(m, SystemMessage):
-                continue
-                
-            role = "assistant" if isinstance(m, AIMessage) else "user"
-            
-            # Filter out raw JSON responses and system prompts
-            if role == "assistant" and m.content.startswith('{"success":'):
-                continue
-            if role == "assistant" and "You are an AI-powered task management assistant" in m.content:
-                continue
-                
-            conv_hist.append({
-                "role": role, 
-                "content": m.content, 
-                "timestamp": str(datetime.utcnow())
-            })
-            
-        return {"response": final_text, "conversation_history": conv_hist}
+        lc_messages = _build_lc_messages(user_message, conversation_history, lc_history_cache)
+        result = _llm_result(llm_tool_agent.invoke({"messages": lc_messages}).get("messages", []), now)
+        if cache_key is not None:
+            _response_cache.set(cache_key, result["response"])
+        return result
     
     # Fallback: use deterministic pipeline
     conversation_history.append({
         "role": "user",
         "content": user_message,
-        "timestamp": str(datetime.utcnow())
+        "timestamp": now
     })
     
     initial_state = {
         "messages": conversation_history,
         "current_task": {},
-        "user_preferences": {}
+        "user_preferences": {},
+        "now": now
     }
     
-    result = deterministic_agent.invoke(initial_state)
+    if USE_DETERMINISTIC_GRAPH:
+        result = get_deterministic_agent().invoke(initial_state)
+    else:
+        result = _fast_deterministic(initial_state)
     
+    response = result["messages"][-1]["content"]
+    if cache_key is not None:
+        _response_cache.set(cache_key, response)
     return {
-        "response": result["messages"][-1]["content"],
+        "response": response,
         "conversation_history": result["messages"]
-    }
\ No newline at end of file
+    }
+
+async def stream_user_message(
+    user_message: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    lc_history_cache: Optional[LCHistoryCache] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the agent's reply while it is generated.
+
+    Yields {"type": "chunk", "delta": ...} events as LLM tokens arrive, then a final
+    {"type": "done", "response": ..., "conversation_history": ...} event shaped like
+    process_user_message's result. Cached replies and the deterministic agent only
+    produce the final event.
+    """
+    if conversation_history is None:
+        conversation_history = []
+    
+    llm_tool_agent = get_llm_tool_agent()
+    if llm_tool_agent is None:
+        result = await asyncio.to_thread(process_user_message, user_message, conversation_history, lc_history_cache)
+        yield {"type": "done", **result}
+        return
+    
+    now = _get_now_iso()
+    # Reading the shared generation may block on Redis
+    cache_key = await asyncio.to_thread(_response_cache_key, user_message, conversation_history)
+    cached = _cached_response(cache_key, user_message, conversation_history, now)
+    if cached is not None:
+        yield {"type": "done", **cached}
+        return
+    
+    lc_messages = _build_lc_messages(user_message, conversation_history, lc_history_cache)
+    final_messages: List[Any] = []
+    async for mode, payload in llm_tool_agent.astream({"messages": lc_messages}, stream_mode=["messages", "values"]):
+        if mode == "messages":
+            chunk, metadata = payload
+            # Only forward model text; tool results also flow through this stream
+            if metadata.get("langgraph_node") == "llm" and isinstance(chunk.content, str) and chunk.content:
+                yield {"type": "chunk", "delta": chunk.content}
+        else:
+            final_messages = payload.get("messages", [])
+    
+    result = _llm_result(final_messages, now)
+    if cache_key is not None:
+        _response_cache.set(cache_key, result["response"])
+    yield {"type": "done", **result}
@@ -0,0 +1,54 @@
+"""add task query indexes
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-15 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# name -> indexed columns, newest-first listings use created_at DESC
+TASK_INDEXES = {
+    "ix_tasks_status_priority_due": ["status", "priority", "due_date"],
+    "ix_tasks_due_date": ["due_date"],
+    "ix_tasks_created_at": [sa.text("created_at DESC")],
+    "ix_tasks_status_created": ["status", sa.text("created_at DESC")],
+    "ix_tasks_priority_created": ["priority", sa.text("created_at DESC")],
+}
+
+
+def _existing_indexes():
+    """Names of the indexes on tasks, or None when the table does not exist yet"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("tasks"):
+        return None
+    return {index["name"] for index in inspector.get_indexes("tasks")}
+
+
+def upgrade() -> None:
+    # create_tables() may already have added some of these on startup, and on a
+    # fresh database it creates the table together with all of them
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name, columns in TASK_INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "tasks", columns)
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name in reversed(list(TASK_INDEXES)):
+        if name in existing:
+            op.drop_index(name, table_name="tasks")
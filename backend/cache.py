@@ -0,0 +1,156 @@
+"""
+Small caches shared by the agent, task tools and REST endpoints.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+import os
+import threading
+import time
+
+# Redis is optional; without it ResponseCache stays in-process
+try:
+    import redis
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:
+    redis = None
+    aioredis = None
+    RedisError = OSError
+
+# Namespace of the REST task list cache; its generation advances on every task write
+TASKS_NAMESPACE = "tasks:list"
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class ResponseCache:
+    """Serialized responses keyed by a generation counter that writes advance.
+
+    Uses Redis when a URL is given and the client is installed, so every
+    worker shares entries and invalidations; otherwise falls back to an
+    in-process TTLCache. Bumping the generation makes earlier entries
+    unreachable in O(1), and a read that raced a write stores its result
+    under the old generation where nobody looks it up. Redis errors are
+    treated as cache misses.
+
+    local_version, if given, is a counter that writes advance without calling
+    invalidate() (such as commits made from worker threads); the in-process
+    fallback folds it into the generation. With Redis those writers bump the
+    shared generation themselves.
+    """
+
+    def __init__(self, namespace: str, ttl: int = 60, redis_url: Optional[str] = None, maxsize: int = 256,
+                 local_version: Optional[Callable[[], int]] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._generation_key = f"{namespace}:generation"
+        self._redis = aioredis.from_url(redis_url) if redis_url and aioredis is not None else None
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._local_generation = 0
+        self._local_version = local_version
+
+    async def _generation(self) -> int:
+        if self._redis is None:
+            # Both counters only grow, so their sum changes whenever either does
+            return self._local_generation + (self._local_version() if self._local_version else 0)
+        return int(await self._redis.get(self._generation_key) or 0)
+
+    async def get(self, key: str) -> Tuple[str, Optional[bytes]]:
+        """Return (versioned key, cached payload or None); pass the key back to set()"""
+        try:
+            versioned_key = f"{self.namespace}:{await self._generation()}:{key}"
+            if self._redis is None:
+                return versioned_key, self._local.get(versioned_key)
+            return versioned_key, await self._redis.get(versioned_key)
+        except RedisError:
+            return "", None
+
+    async def set(self, versioned_key: str, payload: bytes) -> None:
+        if not versioned_key:
+            return
+        if self._redis is None:
+            self._local.set(versioned_key, payload)
+            return
+        try:
+            await self._redis.set(versioned_key, payload, ex=self.ttl)
+        except RedisError:
+            pass
+
+    async def invalidate(self) -> None:
+        if self._redis is None:
+            self._local_generation += 1
+            return
+        try:
+            await self._redis.incr(self._generation_key)
+        except RedisError:
+            pass
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+class SharedGeneration:
+    """Blocking access to a ResponseCache generation, for caches used from threads.
+
+    Keying a thread-local cache on the generation as well as the per-process
+    tasks version makes a write through any worker invalidate it. Without
+    Redis there is a single worker to care about and the generation stays 0.
+    """
+
+    def __init__(self, namespace: str, redis_url: Optional[str] = None):
+        self._generation_key = f"{namespace}:generation"
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=1) if redis_url and redis is not None else None
+
+    def get(self) -> Optional[int]:
+        """Return the current generation, or None if Redis is unreachable and caching should be skipped"""
+        if self._redis is None:
+            return 0
+        try:
+            return int(self._redis.get(self._generation_key) or 0)
+        except RedisError:
+            return None
+
+    def bump(self) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.incr(self._generation_key)
+        except RedisError:
+            pass
+
+
+tasks_generation = SharedGeneration(TASKS_NAMESPACE, os.getenv("REDIS_URL"))
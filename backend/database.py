@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Enum, Text
+from sqlalchemy import create_engine, event, make_url, Column, Integer, String, DateTime, Enum, Text, Index
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 from datetime import datetime
+from itertools import chain
 import enum
 import os
+import threading
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -15,13 +20,114 @@ load_dotenv(dotenv_path=Path(__file__).with_name('.env'))
 # Default uses SQLite for Railway deployment compatibility
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///task_management.db")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+if IS_SQLITE_MEMORY:
+    # The sync and async engines open separate connections, so a private
+    # :memory: database would not be shared; use a named shared-cache one instead
+    DATABASE_URL = "sqlite:///file:task_management?mode=memory&cache=shared&uri=true"
+
+# Async driver used by the REST endpoints for each sync dialect/driver
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = _async_url(DATABASE_URL)
+
+# Set when DATABASE_URL points at PgBouncer in transaction-pool mode (usually port 6432).
+# PgBouncer then owns pooling, so connections are not held on this side.
+USE_PGBOUNCER = os.getenv("USE_PGBOUNCER", "false").lower() == "true"
+
+# Keep enough warm connections for request bursts, recycle them before
+# server/proxy idle timeouts and check liveness on checkout
+_POOL_OPTIONS = {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
 # It is like getting key to cabinet and opening it
-# Force SQLite dialect to avoid MySQL detection issues
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# SQLite connections are shared across threads, so the same-thread check is disabled.
+# An in-memory database only exists while a connection is open, hence a single static one.
+if IS_SQLITE_MEMORY:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        query_cache_size=1200,
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=StaticPool,
+        query_cache_size=1200,
+    )
+elif USE_PGBOUNCER:
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        query_cache_size=1200,
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=NullPool,
+        # Prepared statements do not survive transaction-mode server switching
+        connect_args={"statement_cache_size": 0} if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg") else {},
+        query_cache_size=1200,
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False} if IS_SQLITE else {},
+        poolclass=QueuePool,
+        query_cache_size=1200,
+        **_POOL_OPTIONS,
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        query_cache_size=1200,
+        **_POOL_OPTIONS,
+    )
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL makes writes append-only and lets readers run alongside a writer;
+        # NORMAL sync is durable under WAL without an fsync on every commit.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.close()
 
 #  This is the session maker which is like a key to the cabinet
 # and autocommit and autoflush is set to False so that the changes are not committed to the database until the session is committed and flushed
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit is off so committed objects can still be read without another SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async sessions for the REST endpoints. They wrap the same session class as
+# SessionLocal so the task change tracking below applies to both.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=SessionLocal.class_,
+)
 
 # blue print of database
 Base = declarative_base()
@@ -53,24 +159,89 @@ class Task(Base): #
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Back the status/priority/due_date predicates used by filter_tasks
+        Index("ix_tasks_status_priority_due", "status", "priority", "due_date"),
+        Index("ix_tasks_due_date", "due_date"),
+        # Newest-first listings, optionally narrowed to one status or priority
+        Index("ix_tasks_created_at", created_at.desc()),
+        Index("ix_tasks_status_created", "status", created_at.desc()),
+        Index("ix_tasks_priority_created", "priority", created_at.desc()),
+    )
+
     def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "status": self.status.value,
-            "due_date": self.due_date.isoformat() if self.due_date else None,
-            "priority": self.priority.value,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
-
-def get_db():
-    db = SessionLocal()
-    try:
+        return task_row_to_dict(self)
+
+# Columns selected by list queries that skip ORM object hydration
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.due_date,
+    Task.priority, Task.created_at, Task.updated_at,
+)
+
+def task_row_to_dict(row) -> dict:
+    """Serialize a Task instance or a Core row of TASK_COLUMNS to a plain dict"""
+    due_date = row.due_date
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "status": row.status.value,
+        "due_date": due_date.isoformat() if due_date is not None else None,
+        "priority": row.priority.value,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+# Monotonic version of the tasks table, bumped after every committed task change.
+# Read-side caches include it in their keys so any write invalidates them.
+_tasks_version = 0
+_tasks_version_lock = threading.Lock()
+
+def get_tasks_version() -> int:
+    return _tasks_version
+
+def bump_tasks_version() -> int:
+    global _tasks_version
+    with _tasks_version_lock:
+        _tasks_version += 1
+        return _tasks_version
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_task_changes(session, flush_context):
+    # new/dirty/deleted still reflect the pre-flush state here
+    if any(isinstance(obj, Task) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["tasks_changed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("tasks_changed", False):
+        bump_tasks_version()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop("tasks_changed", None)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any indexes they are missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == "postgresql":
+        create_title_trigram_index()
+
+def create_title_trigram_index():
+    """Let title substring matches (ILIKE '%...%') use a GIN trigram index on PostgreSQL"""
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops)"
+            )
+    except SQLAlchemyError as e:
+        # Managed databases may not allow creating extensions; matches still work, just unindexed
+        print(f"Warning: Could not create the title trigram index: {e}")
@@ -1,28 +1,54 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import json
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketState
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import event, insert, select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+import asyncio
+import os
+from contextvars import ContextVar
+import orjson
 import uvicorn
 from datetime import datetime
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import traceback
 
 # Support both package and script import styles deterministically
 if __package__:
-    from .database import get_db, create_tables, Task
-    from .models import TaskCreate, TaskUpdate, TaskResponse, ChatMessage, ChatRequest
-    from .agent import process_user_message
+    from .database import get_db, create_tables, get_tasks_version, engine, async_engine, AsyncSessionLocal, Task, TaskStatus, TaskPriority, TASK_COLUMNS, task_row_to_dict
+    from .models import TaskCreate, TaskUpdate, TaskResponse, TaskPage, ChatMessage, ChatRequest
+    from .agent import process_user_message, stream_user_message, LCHistoryCache
+    from .cache import ResponseCache, RedisError, aioredis, TASKS_NAMESPACE
 else:  # When started as a script from inside `backend/`
-    from .database import get_db, create_tables, Task
-    from .models import TaskCreate, TaskUpdate, TaskResponse, ChatMessage, ChatRequest
-    from .agent import process_user_message
+    from .database import get_db, create_tables, get_tasks_version, engine, async_engine, AsyncSessionLocal, Task, TaskStatus, TaskPriority, TASK_COLUMNS, task_row_to_dict
+    from .models import TaskCreate, TaskUpdate, TaskResponse, TaskPage, ChatMessage, ChatRequest
+    from .agent import process_user_message, stream_user_message, LCHistoryCache
+    from .cache import ResponseCache, RedisError, aioredis, TASKS_NAMESPACE
+
+# FastAPI's own ORJSONResponse is deprecated in current releases
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str)
+
+def dumps_text(data: Any) -> str:
+    """Serialize a WebSocket payload to a text frame"""
+    return orjson.dumps(data, default=str).decode()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Run at startup
     create_tables()
+    if backplane is not None:
+        await backplane.start()
     yield
-    # Run at shutdown (if needed)
+    # Run at shutdown
+    if backplane is not None:
+        await backplane.stop()
+    await task_list_cache.close()
 
 # Create FastAPI app (explicit docs and OpenAPI URLs)
 app = FastAPI(
@@ -32,6 +58,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -48,31 +75,232 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Development aid (DEBUG=1): report requests that run suspiciously many SQL
+# statements, the usual sign of N+1 lazy loading from per-row to_dict() calls
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true")
+QUERY_WARNING_THRESHOLD = 10
+
+if DEBUG:
+    _request_statements: ContextVar[Optional[List[str]]] = ContextVar("request_statements", default=None)
+
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements = _request_statements.get()
+        if statements is not None:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record_statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _record_statement)
+
+    @app.middleware("http")
+    async def report_statement_count(request, call_next):
+        # The list is shared with the request's task and any threadpool calls
+        # through the copied context
+        statements = []
+        token = _request_statements.set(statements)
+        try:
+            return await call_next(request)
+        finally:
+            _request_statements.reset(token)
+            if len(statements) > QUERY_WARNING_THRESHOLD:
+                print(
+                    f"Warning: {request.method} {request.url.path} ran {len(statements)} SQL statements; "
+                    f"look for lazy loads and add selectinload()/joins to the query"
+                )
+
+# Shared state for multiple workers (task page cache, broadcast backplane); optional
+REDIS_URL = os.getenv("REDIS_URL")
+
+# WebSocket rooms: every client starts in "all"; narrower views can subscribe
+# to "status:<status>" or "priority:<priority>" instead
+ALL_ROOM = "all"
+TASK_ROOMS = frozenset(
+    [ALL_ROOM]
+    + [f"status:{status.value}" for status in TaskStatus]
+    + [f"priority:{priority.value}" for priority in TaskPriority]
+)
+
+def task_rooms(task: Dict[str, Any]) -> Set[str]:
+    """Rooms interested in changes to a serialized task"""
+    return {ALL_ROOM, f"status:{task['status']}", f"priority:{task['priority']}"}
+
+# What a send to a closed or closing socket raises: Starlette's disconnect or
+# the server's OSError-based ClientDisconnected
+DISCONNECT_ERRORS = (WebSocketDisconnect, OSError)
+
+def is_disconnect(websocket: WebSocket, error: BaseException) -> bool:
+    """Whether a failed send just means the client is gone.
+
+    Starlette raises a plain RuntimeError for a send after close; only count
+    it when the socket really is no longer connected, so bugs still surface.
+    """
+    if isinstance(error, DISCONNECT_ERRORS):
+        return True
+    return isinstance(error, RuntimeError) and (
+        websocket.application_state != WebSocketState.CONNECTED
+        or websocket.client_state != WebSocketState.CONNECTED
+    )
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
+        self.rooms: Dict[str, Set[WebSocket]] = {}
+        self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        async with self._lock:
+            self.active_connections.add(websocket)
+            self.rooms.setdefault(ALL_ROOM, set()).add(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    async def disconnect(self, websocket: WebSocket):
+        async with self._lock:
+            self._remove(websocket)
+
+    async def subscribe(self, websocket: WebSocket, room: str):
+        async with self._lock:
+            self.rooms.setdefault(room, set()).add(websocket)
+
+    async def unsubscribe(self, websocket: WebSocket, room: str):
+        async with self._lock:
+            members = self.rooms.get(room)
+            if members is not None:
+                members.discard(websocket)
+                if not members:
+                    del self.rooms[room]
+
+    def _remove(self, websocket: WebSocket):
+        self.active_connections.discard(websocket)
+        for room in [room for room, members in self.rooms.items() if websocket in members]:
+            self.rooms[room].discard(websocket)
+            if not self.rooms[room]:
+                del self.rooms[room]
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Remove disconnected connections
-                self.active_connections.remove(connection)
+    async def broadcast(self, message: bytes):
+        await self._send_to(list(self.active_connections), message)
+
+    async def broadcast_room(self, rooms: Iterable[str], message: bytes):
+        """Send once to every client subscribed to any of rooms"""
+        connections = set()
+        for room in rooms:
+            connections.update(self.rooms.get(room, ()))
+        await self._send_to(list(connections), message)
+
+    async def _send_to(self, connections: List[WebSocket], message: bytes):
+        # Broadcasts are serialized once and sent as binary frames, which skips
+        # the per-connection UTF-8 encode of send_text. Send concurrently so one
+        # slow client does not hold up the rest.
+        results = await asyncio.gather(
+            *(connection.send_bytes(message) for connection in connections),
+            return_exceptions=True,
+        )
+        # Remove disconnected connections; a failed send leaves the socket
+        # unusable either way, but anything other than a disconnect is reported
+        dead = []
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                if not is_disconnect(connection, result):
+                    print(f"Warning: dropping WebSocket client after failed send: {result!r}")
+                dead.append(connection)
+        if dead:
+            async with self._lock:
+                for connection in dead:
+                    self._remove(connection)
 
 manager = ConnectionManager()
 
+# Serialized task pages, shared across workers when REDIS_URL is set.
+# Every task write invalidates all of them, including commits from agent
+# tool threads that outlive a cancelled chat turn.
+task_list_cache = ResponseCache(TASKS_NAMESPACE, ttl=60, redis_url=REDIS_URL, local_version=get_tasks_version)
+
+async def invalidate_if_tasks_changed(version: int):
+    """Invalidate cached task pages if the agent wrote tasks since version was read"""
+    if get_tasks_version() != version:
+        await task_list_cache.invalidate()
+
+# Task pages are keyset-paginated on (created_at, id), newest first. The cursor
+# is "<created_at ISO>|<id>" of the last task on the previous page.
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    return f"{created_at.isoformat()}|{task_id}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    created_at, sep, task_id = cursor.rpartition("|")
+    try:
+        return datetime.fromisoformat(created_at), int(task_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class RedisBackplane:
+    """Relay broadcasts through Redis pub/sub so clients of every worker receive them.
+
+    Each worker publishes once and fans out to its own sockets from the
+    channel. Messages are "<rooms>\n<payload>", where rooms is a
+    comma-separated list or "*" for every connected client.
+    """
+
+    CHANNEL = "tasks"
+
+    def __init__(self, redis_url: str, manager: ConnectionManager):
+        self.manager = manager
+        self._redis = aioredis.from_url(redis_url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+        await self._redis.aclose()
+
+    async def publish(self, message: bytes, rooms: Iterable[str] = None):
+        header = b"*" if rooms is None else ",".join(rooms).encode()
+        try:
+            await self._redis.publish(self.CHANNEL, header + b"\n" + message)
+        except RedisError:
+            # Redis is unreachable; at least reach the clients on this worker
+            await deliver_locally(message, rooms)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for item in pubsub.listen():
+                        if item["type"] != "message":
+                            continue
+                        header, _, message = item["data"].partition(b"\n")
+                        rooms = None if header == b"*" else header.decode().split(",")
+                        await deliver_locally(message, rooms)
+            except RedisError:
+                # Resubscribe once Redis is reachable again
+                await asyncio.sleep(1)
+
+async def deliver_locally(message: bytes, rooms: Iterable[str] = None):
+    if rooms is None:
+        await manager.broadcast(message)
+    else:
+        await manager.broadcast_room(rooms, message)
+
+# Only needed with several workers; without REDIS_URL broadcasts stay in-process
+backplane = RedisBackplane(REDIS_URL, manager) if REDIS_URL and aioredis is not None else None
+
+# Strong references to in-flight broadcasts; the event loop only keeps weak ones
+_background_tasks = set()
+
+def broadcast_in_background(message: bytes, rooms: Iterable[str] = None):
+    """Schedule a broadcast, to all clients or only to rooms, without making the caller wait"""
+    if backplane is not None:
+        task = asyncio.create_task(backplane.publish(message, rooms))
+    else:
+        task = asyncio.create_task(deliver_locally(message, rooms))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 # Database tables are created in the lifespan startup handler
 
 # Health check endpoint
@@ -84,145 +312,312 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "AI Task Management API is running"}
 
-# WebSocket endpoint for chat
-@app.websocket("/ws/chat")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
-    try:
-        while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
-            
-            # Process the message with the AI agent
-            result = process_user_message(
-                message_data.get("message", ""),
-                message_data.get("conversation_history", [])
-            )
+async def run_chat_turn(websocket: WebSocket, message_data: Dict[str, Any], lc_history_cache: LCHistoryCache, turn_lock: asyncio.Lock):
+    """Answer one chat message on a WebSocket and announce the possible task changes"""
+    # Turns on a connection share its history cache, so they run one at a time
+    # in arrival order
+    async with turn_lock:
+        tasks_version = get_tasks_version()
+        try:
+            result = None
+            if message_data.get("stream"):
+                # Forward tokens as they arrive, then the final response
+                async for event in stream_user_message(
+                    message_data.get("message", ""),
+                    message_data.get("conversation_history", []),
+                    lc_history_cache
+                ):
+                    if event["type"] == "chunk":
+                        await manager.send_personal_message(
+                            dumps_text({"type": "agent_response_chunk", "delta": event["delta"]}),
+                            websocket
+                        )
+                    else:
+                        result = event
+                if result is None:
+                    raise RuntimeError("Agent stream ended without a final response")
+            else:
+                # The agent does blocking LLM and database calls, keep them off the event loop
+                result = await run_in_threadpool(
+                    process_user_message,
+                    message_data.get("message", ""),
+                    message_data.get("conversation_history", []),
+                    lc_history_cache
+                )
             
             # Send response back to client
             await manager.send_personal_message(
-                json.dumps({
+                dumps_text({
                     "type": "agent_response",
                     "response": result["response"],
                     "conversation_history": result["conversation_history"]
                 }),
                 websocket
             )
+        except Exception:
+            # Let the client stop waiting; the error itself is logged by log_failed_turn
+            with suppress(Exception):
+                await manager.send_personal_message(
+                    dumps_text({"type": "error", "message": "Sorry, something went wrong while processing your message."}),
+                    websocket
+                )
+            raise
+        finally:
+            # Tools may have written tasks even if the turn failed afterwards
+            await invalidate_if_tasks_changed(tasks_version)
+    
+    # Broadcast task list update to all connected clients
+    broadcast_in_background(
+        orjson.dumps({
+            "type": "task_list_update",
+            "message": "Task list updated"
+        })
+    )
+
+def log_failed_turn(turn: asyncio.Task):
+    """Log the exception of a chat turn that failed, so it does not go unnoticed"""
+    if turn.cancelled():
+        return
+    error = turn.exception()
+    if error is not None:
+        print(f"Warning: chat turn failed: {error!r}")
+        traceback.print_exception(error)
+
+# WebSocket endpoint for chat
+@app.websocket("/ws/chat")
+async def websocket_endpoint(websocket: WebSocket):
+    await manager.connect(websocket)
+    lc_history_cache = LCHistoryCache()
+    # Chat turns run as tasks so the socket keeps receiving (e.g. room
+    # changes) while the agent works
+    turn_lock = asyncio.Lock()
+    turns = set()
+    try:
+        while True:
+            # Receive message from client
+            data = await websocket.receive_text()
+            message_data = orjson.loads(data)
             
-            # Broadcast task list update to all connected clients
-            await manager.broadcast(
-                json.dumps({
-                    "type": "task_list_update",
-                    "message": "Task list updated"
-                })
-            )
+            if message_data.get("type") in ("subscribe", "unsubscribe"):
+                # Room control messages; unknown rooms are ignored
+                room = message_data.get("room")
+                if room in TASK_ROOMS:
+                    if message_data["type"] == "subscribe":
+                        await manager.subscribe(websocket, room)
+                    else:
+                        await manager.unsubscribe(websocket, room)
+                continue
+            
+            turn = asyncio.create_task(run_chat_turn(websocket, message_data, lc_history_cache, turn_lock))
+            turns.add(turn)
+            turn.add_done_callback(turns.discard)
+            turn.add_done_callback(log_failed_turn)
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        for turn in list(turns):
+            turn.cancel()
+        await manager.disconnect(websocket)
 
 # REST API endpoints for task management
-@app.get("/api/tasks", response_model=List[TaskResponse])
-async def get_tasks(db: Session = Depends(get_db)):
-    """Get all tasks"""
-    tasks = db.query(Task).order_by(Task.created_at.desc()).all()
-    return tasks
-
-@app.get("/api/tasks/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, db: Session = Depends(get_db)):
+# The page is built from plain columns and handed straight to orjson; the
+# schema is only declared for the OpenAPI docs
+@app.get("/api/tasks", response_model=None, responses={200: {"model": TaskPage}})
+async def get_tasks(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a page of tasks, optionally filtered by status and priority"""
+    cache_key, payload = await task_list_cache.get(
+        f"{limit}|{cursor or ''}|{status.value if status else ''}|{priority.value if priority else ''}"
+    )
+    if payload is not None:
+        return Response(payload, media_type="application/json")
+    
+    query = select(*TASK_COLUMNS)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if priority is not None:
+        query = query.where(Task.priority == priority)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Task.created_at < created_at,
+            and_(Task.created_at == created_at, Task.id < task_id),
+        ))
+    # One extra row tells whether another page follows
+    result = await db.execute(
+        query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    payload = orjson.dumps({
+        "items": [task_row_to_dict(row) for row in rows],
+        "next_cursor": next_cursor,
+    })
+    await task_list_cache.set(cache_key, payload)
+    return Response(payload, media_type="application/json")
+
+@app.get("/api/tasks/export", response_model=None, responses={200: {"model": List[TaskResponse]}})
+async def export_tasks(status: Optional[TaskStatus] = None, priority: Optional[TaskPriority] = None):
+    """Stream every matching task as one JSON array, newest first"""
+    query = select(*TASK_COLUMNS)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if priority is not None:
+        query = query.where(Task.priority == priority)
+    query = query.order_by(Task.created_at.desc(), Task.id.desc())
+    
+    async def rows_as_json():
+        # The session lives as long as the stream rather than the request
+        # handler; rows are fetched and encoded in batches so the whole
+        # table is never held in memory at once.
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=200))
+            separator = b"["
+            async for rows in result.partitions():
+                yield separator + b",".join(orjson.dumps(task_row_to_dict(row)) for row in rows)
+                separator = b","
+            yield b"]" if separator == b"," else b"[]"
+    
+    return StreamingResponse(rows_as_json(), media_type="application/json")
+
+# Single-task responses are built from data just read or written, so they skip
+# response_model revalidation; TaskResponse documents them in OpenAPI
+TASK_RESPONSES = {200: {"model": TaskResponse}}
+
+@app.get("/api/tasks/{task_id}", response_model=None, responses=TASK_RESPONSES)
+async def get_task(task_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific task by ID"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    result = await db.execute(select(*TASK_COLUMNS).where(Task.id == task_id))
+    row = result.first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return ORJSONResponse(task_row_to_dict(row))
 
-@app.post("/api/tasks", response_model=TaskResponse)
-async def create_task_endpoint(task: TaskCreate, db: Session = Depends(get_db)):
+@app.post("/api/tasks", response_model=None, responses=TASK_RESPONSES)
+async def create_task_endpoint(task: TaskCreate, db: AsyncSession = Depends(get_db)):
     """Create a new task"""
-    db_task = Task(**task.dict())
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    if db.bind.dialect.insert_returning:
+        # One INSERT ... RETURNING hands back the stored row, defaults included
+        result = await db.execute(insert(Task).values(**task.model_dump()).returning(*TASK_COLUMNS))
+        task_data = task_row_to_dict(result.one())
+        # Core statements skip the flush hook that marks task changes
+        db.info["tasks_changed"] = True
+    else:
+        db_task = Task(**task.model_dump())
+        db.add(db_task)
+        await db.flush()
+        task_data = db_task.to_dict()
+    await db.commit()
+    await task_list_cache.invalidate()
     
-    # Broadcast update to all connected clients
-    await manager.broadcast(
-        json.dumps({
+    # Broadcast the new task to the clients watching its rooms
+    broadcast_in_background(
+        orjson.dumps({
             "type": "task_created",
-            "task": db_task.to_dict()
-        })
+            "task": task_data
+        }),
+        task_rooms(task_data)
     )
     
-    return db_task
+    return ORJSONResponse(task_data)
 
-@app.put("/api/tasks/{task_id}", response_model=TaskResponse)
-async def update_task_endpoint(task_id: int, task_update: TaskUpdate, db: Session = Depends(get_db)):
+@app.put("/api/tasks/{task_id}", response_model=None, responses=TASK_RESPONSES)
+async def update_task_endpoint(task_id: int, task_update: TaskUpdate, db: AsyncSession = Depends(get_db)):
     """Update a task"""
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    db_task = await db.get(Task, task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    update_data = task_update.dict(exclude_unset=True)
+    # Clients watching the old status/priority need to see the task leave
+    rooms = task_rooms(db_task.to_dict())
+    update_data = task_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_task, field, value)
     
     db_task.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await task_list_cache.invalidate()
     
-    # Broadcast update to all connected clients
-    await manager.broadcast(
-        json.dumps({
+    # Broadcast the changed task to the clients watching its old or new rooms
+    task_data = db_task.to_dict()
+    broadcast_in_background(
+        orjson.dumps({
             "type": "task_updated",
-            "task": db_task.to_dict()
-        })
+            "task": task_data
+        }),
+        rooms | task_rooms(task_data)
     )
     
-    return db_task
+    return ORJSONResponse(task_data)
 
 @app.delete("/api/tasks/{task_id}")
-async def delete_task_endpoint(task_id: int, db: Session = Depends(get_db)):
+async def delete_task_endpoint(task_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a task"""
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    db_task = await db.get(Task, task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    db.delete(db_task)
-    db.commit()
+    rooms = task_rooms(db_task.to_dict())
+    await db.delete(db_task)
+    await db.commit()
+    await task_list_cache.invalidate()
     
-    # Broadcast update to all connected clients
-    await manager.broadcast(
-        json.dumps({
+    # Broadcast the removal to the clients watching the task's rooms
+    broadcast_in_background(
+        orjson.dumps({
             "type": "task_deleted",
             "task_id": task_id
-        })
+        }),
+        rooms
     )
     
     return {"message": "Task deleted successfully"}
 
-@app.get("/api/tasks/filter/{status}")
-async def filter_tasks_by_status(status: str, db: Session = Depends(get_db)):
-    """Filter tasks by status"""
-    tasks = db.query(Task).filter(Task.status == status).order_by(Task.created_at.desc()).all()
-    return tasks
-
-@app.get("/api/tasks/priority/{priority}")
-async def filter_tasks_by_priority(priority: str, db: Session = Depends(get_db)):
-    """Filter tasks by priority"""
-    tasks = db.query(Task).filter(Task.priority == priority).order_by(Task.created_at.desc()).all()
-    return tasks
-
 # Chat endpoint for non-WebSocket clients
 @app.post("/api/chat")
 async def chat_endpoint(request: ChatRequest):
     """Process a chat message and return AI response"""
-    result = process_user_message(request.message)
+    tasks_version = get_tasks_version()
+    result = await run_in_threadpool(process_user_message, request.message)
+    await invalidate_if_tasks_changed(tasks_version)
     
     return {
         "response": result["response"],
         "conversation_history": result["conversation_history"]
     }
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Stream the AI response as server-sent events"""
+    async def event_stream():
+        tasks_version = get_tasks_version()
+        async for event in stream_user_message(request.message):
+            if event["type"] != "chunk":
+                await invalidate_if_tasks_changed(tasks_version)
+            yield b"data: " + orjson.dumps(event, default=str) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # uvloop/httptools come with uvicorn[standard]; "auto" falls back to
+    # asyncio where uvloop is unavailable (e.g. Windows). Extra workers need
+    # an import string and are opt-in via WEB_CONCURRENCY; set REDIS_URL with
+    # them so broadcasts and cached task pages are shared (the agent's caches
+    # stay per-worker).
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="auto",
+        http="httptools",
+        ws="websockets",
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+    )
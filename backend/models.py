@@ -1,23 +1,38 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from .database import TaskStatus, TaskPriority
 
+def _naive_due_date(value: Optional[datetime]) -> Optional[datetime]:
+    # due_date is a naive DateTime column, which keeps the wall-clock time and
+    # drops any offset; do the same up front so responses match what is stored
+    return value.replace(tzinfo=None) if value is not None else None
+
 # Inside Field ... means that the field is required
 class TaskCreate(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     title: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
     due_date: Optional[datetime] = None
     priority: TaskPriority = TaskPriority.MEDIUM
 
+    _normalize_due_date = field_validator("due_date")(_naive_due_date)
+
 class TaskUpdate(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
     due_date: Optional[datetime] = None
     priority: Optional[TaskPriority] = None
 
+    _normalize_due_date = field_validator("due_date")(_naive_due_date)
+
 class TaskResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str
     description: Optional[str]
@@ -27,8 +42,9 @@ class TaskResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
 
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -1,14 +1,78 @@
 from typing import List, Optional, Dict, Any
 if __package__:
-    from .database import Task, TaskStatus, TaskPriority, SessionLocal
+    from .database import Task, TaskStatus, TaskPriority, SessionLocal, get_tasks_version, TASK_COLUMNS, task_row_to_dict
+    from .cache import TTLCache, tasks_generation
 else:
-    from .database import Task, TaskStatus, TaskPriority, SessionLocal
+    from .database import Task, TaskStatus, TaskPriority, SessionLocal, get_tasks_version, TASK_COLUMNS, task_row_to_dict
+    from .cache import TTLCache, tasks_generation
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
+import functools
+import sys
+
+# Serialized list/filter results, keyed on call arguments plus the tasks version
+# and the shared generation, so a committed write in any worker makes earlier
+# entries unreachable.
+_read_cache = TTLCache(maxsize=256, ttl=60)
+
+# Enum lookups by value, so invalid input is a dict miss rather than a raised ValueError
+_STATUS_MAP = {s.value: s for s in TaskStatus}
+_PRIORITY_MAP = {p.value: p for p in TaskPriority}
+_STATUS_ERR = f"Invalid status. Must be one of: {list(_STATUS_MAP)}"
+_PRIORITY_ERR = f"Invalid priority. Must be one of: {list(_PRIORITY_MAP)}"
+
+# Substring title matches shorter than a trigram cannot use the title index
+# and would scan every row
+_MIN_TITLE_MATCH = 3
+_TITLE_MATCH_ERR = f"Title match must be at least {_MIN_TITLE_MATCH} characters. Use the task ID instead."
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts a trailing "Z" from 3.11 on
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value: str) -> datetime:
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO date/datetime; the agent tends to repeat the same few values.
+
+    Any offset is dropped, as the naive due_date column would on write.
+    """
+    return _fromisoformat(value).replace(tzinfo=None)
 
 def get_db_session():
     """Get a database session"""
     return SessionLocal()
 
+def _find_task(db, task_id: Optional[int], title_match: Optional[str]) -> Optional[Task]:
+    """Look a task up by ID, or else by case-insensitive title substring"""
+    if task_id:
+        return db.get(Task, task_id)
+    if title_match:
+        return db.execute(select(Task).where(Task.title.ilike(f"%{title_match}%")).limit(1)).scalar()
+    return None
+
+def _cached_read(func):
+    """Cache successful read results until the tasks table changes.
+
+    Cached dictionaries are shared between callers and must not be mutated.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        generation = tasks_generation.get()
+        if generation is None:
+            return func(*args, **kwargs)
+        key = (func.__name__, args, frozenset(kwargs.items()), get_tasks_version(), generation)
+        result = _read_cache.get(key)
+        if result is None:
+            result = func(*args, **kwargs)
+            if result.get("success"):
+                _read_cache.set(key, result)
+        return result
+    return wrapper
+
 def create_task(
     title: str,
     description: Optional[str] = None,
@@ -28,48 +92,43 @@ def create_task(
     Returns:
         Dictionary containing the created task details
     """
-    db = get_db_session()
-    try:
-        # Parse due_date if provided
-        parsed_due_date = None
-        if due_date:
-            try:
-                parsed_due_date = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-            except ValueError:
-                return {"error": "Invalid date format. Use YYYY-MM-DD format."}
-        
-        # Validate priority
+    # Validate before touching the database
+    parsed_due_date = None
+    if due_date:
         try:
-            task_priority = TaskPriority(priority.lower())
+            parsed_due_date = _parse_iso(due_date)
         except ValueError:
-            return {"error": f"Invalid priority. Must be one of: {[p.value for p in TaskPriority]}"}
-        
-        # Include time hint in description if present (simple UX improvement without schema change)
-        final_description = description
-        if time_hint:
-            final_description = (description + f" | time: {time_hint}") if description else f"time: {time_hint}"
-        
-        task = Task(
-            title=title,
-            description=final_description,
-            due_date=parsed_due_date,
-            priority=task_priority
-        )
-        
-        db.add(task)
-        db.commit()
-        db.refresh(task)
-        
-        return {
-            "success": True,
-            "message": f"Task '{title}' created successfully",
-            "task": task.to_dict()
-        }
-    except Exception as e:
-        db.rollback()
+            return {"error": "Invalid date format. Use YYYY-MM-DD format."}
+    
+    task_priority = _PRIORITY_MAP.get(priority.lower())
+    if task_priority is None:
+        return {"error": _PRIORITY_ERR}
+    
+    # Include time hint in description if present (simple UX improvement without schema change)
+    final_description = description
+    if time_hint:
+        final_description = (description + f" | time: {time_hint}") if description else f"time: {time_hint}"
+    
+    try:
+        with get_db_session() as db:
+            task = Task(
+                title=title,
+                description=final_description,
+                due_date=parsed_due_date,
+                priority=task_priority
+            )
+            
+            db.add(task)
+            db.commit()
+            tasks_generation.bump()
+            
+            return {
+                "success": True,
+                "message": f"Task '{title}' created successfully",
+                "task": task.to_dict()
+            }
+    except SQLAlchemyError as e:
         return {"error": f"Failed to create task: {str(e)}"}
-    finally:
-        db.close()
 
 def update_task(
     task_id: Optional[int] = None,
@@ -95,53 +154,55 @@ def update_task(
     Returns:
         Dictionary containing the update result
     """
-    db = get_db_session()
+    # Validate before touching the database
+    if not task_id and title_match and len(title_match) < _MIN_TITLE_MATCH:
+        return {"error": _TITLE_MATCH_ERR}
+    task_status = None
+    if status is not None:
+        task_status = _STATUS_MAP.get(status.lower())
+        if task_status is None:
+            return {"error": _STATUS_ERR}
+    parsed_due_date = None
+    if due_date is not None:
+        try:
+            parsed_due_date = _parse_iso(due_date)
+        except ValueError:
+            return {"error": "Invalid date format. Use YYYY-MM-DD format."}
+    task_priority = None
+    if priority is not None:
+        task_priority = _PRIORITY_MAP.get(priority.lower())
+        if task_priority is None:
+            return {"error": _PRIORITY_ERR}
+    
     try:
-        # Find the task
-        task = None
-        if task_id:
-            task = db.query(Task).filter(Task.id == task_id).first()
-        elif title_match:
-            task = db.query(Task).filter(Task.title.ilike(f"%{title_match}%")).first()
-        
-        if not task:
-            return {"error": "Task not found"}
-        
-        # Update fields
-        if title is not None:
-            task.title = title
-        if description is not None:
-            task.description = description
-        if status is not None:
-            try:
-                task.status = TaskStatus(status.lower())
-            except ValueError:
-                return {"error": f"Invalid status. Must be one of: {[s.value for s in TaskStatus]}"}
-        if due_date is not None:
-            try:
-                task.due_date = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-            except ValueError:
-                return {"error": "Invalid date format. Use YYYY-MM-DD format."}
-        if priority is not None:
-            try:
-                task.priority = TaskPriority(priority.lower())
-            except ValueError:
-                return {"error": f"Invalid priority. Must be one of: {[p.value for p in TaskPriority]}"}
-        
-        task.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(task)
-        
-        return {
-            "success": True,
-            "message": f"Task '{task.title}' updated successfully",
-            "task": task.to_dict()
-        }
-    except Exception as e:
-        db.rollback()
+        with get_db_session() as db:
+            task = _find_task(db, task_id, title_match)
+            if not task:
+                return {"error": "Task not found"}
+            
+            # Update fields
+            if title is not None:
+                task.title = title
+            if description is not None:
+                task.description = description
+            if task_status is not None:
+                task.status = task_status
+            if parsed_due_date is not None:
+                task.due_date = parsed_due_date
+            if task_priority is not None:
+                task.priority = task_priority
+            
+            task.updated_at = datetime.utcnow()
+            db.commit()
+            tasks_generation.bump()
+            
+            return {
+                "success": True,
+                "message": f"Task '{task.title}' updated successfully",
+                "task": task.to_dict()
+            }
+    except SQLAlchemyError as e:
         return {"error": f"Failed to update task: {str(e)}"}
-    finally:
-        db.close()
 
 def delete_task(task_id: Optional[int] = None, title_match: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -154,32 +215,28 @@ def delete_task(task_id: Optional[int] = None, title_match: Optional[str] = None
     Returns:
         Dictionary containing the deletion result
     """
-    db = get_db_session()
+    if not task_id and title_match and len(title_match) < _MIN_TITLE_MATCH:
+        return {"error": _TITLE_MATCH_ERR}
+    
     try:
-        # Find the task
-        task = None
-        if task_id:
-            task = db.query(Task).filter(Task.id == task_id).first()
-        elif title_match:
-            task = db.query(Task).filter(Task.title.ilike(f"%{title_match}%")).first()
-        
-        if not task:
-            return {"error": "Task not found"}
-        
-        task_title = task.title
-        db.delete(task)
-        db.commit()
-        
-        return {
-            "success": True,
-            "message": f"Task '{task_title}' deleted successfully"
-        }
-    except Exception as e:
-        db.rollback()
+        with get_db_session() as db:
+            task = _find_task(db, task_id, title_match)
+            if not task:
+                return {"error": "Task not found"}
+            
+            task_title = task.title
+            db.delete(task)
+            db.commit()
+            tasks_generation.bump()
+            
+            return {
+                "success": True,
+                "message": f"Task '{task_title}' deleted successfully"
+            }
+    except SQLAlchemyError as e:
         return {"error": f"Failed to delete task: {str(e)}"}
-    finally:
-        db.close()
 
+@_cached_read
 def list_tasks() -> Dict[str, Any]:
     """
     List all tasks.
@@ -187,20 +244,19 @@ def list_tasks() -> Dict[str, Any]:
     Returns:
         Dictionary containing all tasks
     """
-    db = get_db_session()
     try:
-        tasks = db.query(Task).order_by(Task.created_at.desc()).all()
-        
-        return {
-            "success": True,
-            "tasks": [task.to_dict() for task in tasks],
-            "count": len(tasks)
-        }
-    except Exception as e:
+        with get_db_session() as db:
+            rows = db.execute(select(*TASK_COLUMNS).order_by(Task.created_at.desc())).all()
+    except SQLAlchemyError as e:
         return {"error": f"Failed to list tasks: {str(e)}"}
-    finally:
-        db.close()
+    
+    return {
+        "success": True,
+        "tasks": [task_row_to_dict(row) for row in rows],
+        "count": len(rows)
+    }
 
+@_cached_read
 def filter_tasks(
     status: Optional[str] = None,
     priority: Optional[str] = None,
@@ -219,52 +275,49 @@ def filter_tasks(
     Returns:
         Dictionary containing filtered tasks
     """
-    db = get_db_session()
+    # Build and validate the query before touching the database
+    query = select(*TASK_COLUMNS)
+    
+    if status:
+        task_status = _STATUS_MAP.get(status.lower())
+        if task_status is None:
+            return {"error": _STATUS_ERR}
+        query = query.where(Task.status == task_status)
+    
+    if priority:
+        task_priority = _PRIORITY_MAP.get(priority.lower())
+        if task_priority is None:
+            return {"error": _PRIORITY_ERR}
+        query = query.where(Task.priority == task_priority)
+    
+    if due_date_from:
+        try:
+            from_date = _parse_iso(due_date_from)
+        except ValueError:
+            return {"error": "Invalid due_date_from format. Use YYYY-MM-DD format."}
+        query = query.where(Task.due_date >= from_date)
+    
+    if due_date_to:
+        try:
+            to_date = _parse_iso(due_date_to)
+        except ValueError:
+            return {"error": "Invalid due_date_to format. Use YYYY-MM-DD format."}
+        query = query.where(Task.due_date <= to_date)
+    
     try:
-        query = db.query(Task)
-        
-        if status:
-            try:
-                task_status = TaskStatus(status.lower())
-                query = query.filter(Task.status == task_status)
-            except ValueError:
-                return {"error": f"Invalid status. Must be one of: {[s.value for s in TaskStatus]}"}
-        
-        if priority:
-            try:
-                task_priority = TaskPriority(priority.lower())
-                query = query.filter(Task.priority == task_priority)
-            except ValueError:
-                return {"error": f"Invalid priority. Must be one of: {[p.value for p in TaskPriority]}"}
-        
-        if due_date_from:
-            try:
-                from_date = datetime.fromisoformat(due_date_from.replace('Z', '+00:00'))
-                query = query.filter(Task.due_date >= from_date)
-            except ValueError:
-                return {"error": "Invalid due_date_from format. Use YYYY-MM-DD format."}
-        
-        if due_date_to:
-            try:
-                to_date = datetime.fromisoformat(due_date_to.replace('Z', '+00:00'))
-                query = query.filter(Task.due_date <= to_date)
-            except ValueError:
-                return {"error": "Invalid due_date_to format. Use YYYY-MM-DD format."}
-        
-        tasks = query.order_by(Task.created_at.desc()).all()
-        
-        return {
-            "success": True,
-            "tasks": [task.to_dict() for task in tasks],
-            "count": len(tasks),
-            "filters": {
-                "status": status,
-                "priority": priority,
-                "due_date_from": due_date_from,
-                "due_date_to": due_date_to
-            }
-        }
-    except Exception as e:
+        with get_db_session() as db:
+            rows = db.execute(query.order_by(Task.created_at.desc())).all()
+    except SQLAlchemyError as e:
         return {"error": f"Failed to filter tasks: {str(e)}"}
-    finally:
-        db.close()
+    
+    return {
+        "success": True,
+        "tasks": [task_row_to_dict(row) for row in rows],
+        "count": len(rows),
+        "filters": {
+            "status": status,
+            "priority": priority,
+            "due_date_from": due_date_from,
+            "due_date_to": due_date_to
+        }
+    }
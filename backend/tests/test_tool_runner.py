@@ -0,0 +1,61 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import MessagesState
+
+from backend.agent import create_tool_runner
+
+
+def _recording_tools(calls):
+    def make(name):
+        def run(label: str) -> str:
+            calls.append((name, label))
+            return f"{name}:{label}"
+        return StructuredTool.from_function(run, name=name, description=name)
+    return [make("list_tasks"), make("create_task"), make("filter_tasks")]
+
+
+def _tools_graph(tools):
+    # ToolNode needs the runtime a compiled graph provides
+    graph = StateGraph(MessagesState)
+    graph.add_node("tools", create_tool_runner(tools))
+    graph.add_edge(START, "tools")
+    graph.add_edge("tools", END)
+    return graph.compile()
+
+
+def _tool_results(result):
+    return result["messages"][1:]
+
+
+def _interleaved_turn():
+    return AIMessage(content="", tool_calls=[
+        {"name": "list_tasks", "args": {"label": "first read"}, "id": "call-1"},
+        {"name": "create_task", "args": {"label": "write"}, "id": "call-2"},
+        {"name": "filter_tasks", "args": {"label": "second read"}, "id": "call-3"},
+    ])
+
+
+def test_results_follow_tool_call_order():
+    calls = []
+    graph = _tools_graph(_recording_tools(calls))
+
+    results = _tool_results(graph.invoke({"messages": [_interleaved_turn()]}))
+
+    # The write runs before the reads so they observe it...
+    assert calls[0] == ("create_task", "write")
+    # ...but the results come back in the order the model asked for them
+    assert [m.tool_call_id for m in results] == ["call-1", "call-2", "call-3"]
+    assert [m.content for m in results] == [
+        "list_tasks:first read", "create_task:write", "filter_tasks:second read",
+    ]
+
+
+def test_async_results_follow_tool_call_order():
+    graph = _tools_graph(_recording_tools([]))
+
+    results = _tool_results(asyncio.run(graph.ainvoke({"messages": [_interleaved_turn()]})))
+
+    assert [m.tool_call_id for m in results] == ["call-1", "call-2", "call-3"]
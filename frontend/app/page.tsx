@@ -12,6 +12,7 @@ import { Wifi, WifiOff } from 'lucide-react'
 export default function HomePage() {
   const [tasks, setTasks] = useState<Task[]>([])
   const [messages, setMessages] = useState<ChatMessage[]>([])
+  const [streamingResponse, setStreamingResponse] = useState('')
   const [isLoading, setIsLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
 
@@ -22,19 +23,41 @@ export default function HomePage() {
     url: wsUrl,
     onMessage: (message: WebSocketMessage) => {
       switch (message.type) {
+        case 'agent_response_chunk':
+          if (message.delta) {
+            setStreamingResponse(prev => prev + message.delta)
+          }
+          break
         case 'agent_response':
           if (message.response && message.conversation_history) {
             setMessages(message.conversation_history)
           }
+          setStreamingResponse('')
+          setIsLoading(false)
+          break
+        case 'error':
+          setError(message.message || 'Something went wrong. Please try again.')
+          setStreamingResponse('')
           setIsLoading(false)
           break
         case 'task_list_update':
           fetchTasks()
           break
+        // Task events carry the change itself, so apply it without refetching
         case 'task_created':
+          if (message.task) {
+            const created = message.task
+            setTasks(prev => [created, ...prev.filter(task => task.id !== created.id)])
+          }
+          break
         case 'task_updated':
+          if (message.task) {
+            const updated = message.task
+            setTasks(prev => prev.map(task => (task.id === updated.id ? updated : task)))
+          }
+          break
         case 'task_deleted':
-          fetchTasks()
+          setTasks(prev => prev.filter(task => task.id !== message.task_id))
           break
       }
     },
@@ -87,6 +110,7 @@ export default function HomePage() {
     sendMessage({
       message,
       conversation_history: messages,
+      stream: true,
     })
   }
 
@@ -162,7 +186,11 @@ export default function HomePage() {
           {/* Chat Interface */}
           <div className="flex flex-col">
             <ChatInterface
-              messages={messages}
+              messages={
+                streamingResponse
+                  ? [...messages, { role: 'assistant', content: streamingResponse, timestamp: new Date().toISOString() }]
+                  : messages
+              }
               onSendMessage={handleSendMessage}
               isLoading={isLoading}
             />
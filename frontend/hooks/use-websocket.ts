@@ -3,6 +3,9 @@
 import { useEffect, useRef, useState } from 'react'
 import { WebSocketMessage, ChatMessage } from '@/lib/types'
 
+// Broadcasts arrive as binary frames holding UTF-8 JSON
+const textDecoder = new TextDecoder()
+
 interface UseWebSocketProps {
   url: string
   onMessage?: (message: WebSocketMessage) => void
@@ -28,6 +31,7 @@ export function useWebSocket({
   const connect = () => {
     try {
       ws.current = new WebSocket(url)
+      ws.current.binaryType = 'arraybuffer'
       
       ws.current.onopen = () => {
         setIsConnected(true)
@@ -38,7 +42,8 @@ export function useWebSocket({
 
       ws.current.onmessage = (event) => {
         try {
-          const message: WebSocketMessage = JSON.parse(event.data)
+          const data = typeof event.data === 'string' ? event.data : textDecoder.decode(event.data)
+          const message: WebSocketMessage = JSON.parse(data)
           onMessage?.(message)
         } catch (err) {
           console.error('Failed to parse WebSocket message:', err)
@@ -1,4 +1,4 @@
-import { Task } from './types'
+import { Task, TaskPage, TaskQuery } from './types'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
@@ -9,14 +9,32 @@ export class ApiClient {
     this.baseUrl = baseUrl
   }
 
-  async getTasks(): Promise<Task[]> {
-    const response = await fetch(`${this.baseUrl}/api/tasks`)
+  async getTaskPage(query: TaskQuery = {}): Promise<TaskPage> {
+    const params = new URLSearchParams()
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined) {
+        params.set(key, String(value))
+      }
+    })
+    const response = await fetch(`${this.baseUrl}/api/tasks?${params}`)
     if (!response.ok) {
       throw new Error('Failed to fetch tasks')
     }
     return response.json()
   }
 
+  // Follows next_cursor until every matching task has been fetched
+  async getTasks(query: Omit<TaskQuery, 'cursor'> = {}): Promise<Task[]> {
+    const tasks: Task[] = []
+    let cursor: string | undefined
+    do {
+      const page = await this.getTaskPage({ limit: 500, ...query, cursor })
+      tasks.push(...page.items)
+      cursor = page.next_cursor ?? undefined
+    } while (cursor)
+    return tasks
+  }
+
   async getTask(id: number): Promise<Task> {
     const response = await fetch(`${this.baseUrl}/api/tasks/${id}`)
     if (!response.ok) {
@@ -62,20 +80,12 @@ export class ApiClient {
     }
   }
 
-  async filterTasksByStatus(status: string): Promise<Task[]> {
-    const response = await fetch(`${this.baseUrl}/api/tasks/filter/${status}`)
-    if (!response.ok) {
-      throw new Error('Failed to filter tasks')
-    }
-    return response.json()
+  async filterTasksByStatus(status: Task['status']): Promise<Task[]> {
+    return this.getTasks({ status })
   }
 
-  async filterTasksByPriority(priority: string): Promise<Task[]> {
-    const response = await fetch(`${this.baseUrl}/api/tasks/priority/${priority}`)
-    if (!response.ok) {
-      throw new Error('Failed to filter tasks')
-    }
-    return response.json()
+  async filterTasksByPriority(priority: Task['priority']): Promise<Task[]> {
+    return this.getTasks({ priority })
   }
 
   async sendChatMessage(message: string): Promise<{ response: string; conversation_history: any[] }> {
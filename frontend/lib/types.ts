@@ -9,6 +9,18 @@ export interface Task {
   updated_at: string
 }
 
+export interface TaskPage {
+  items: Task[]
+  next_cursor: string | null
+}
+
+export interface TaskQuery {
+  status?: Task['status']
+  priority?: Task['priority']
+  limit?: number
+  cursor?: string
+}
+
 export interface ChatMessage {
   role: 'user' | 'assistant'
   content: string
@@ -16,8 +28,9 @@ export interface ChatMessage {
 }
 
 export interface WebSocketMessage {
-  type: 'agent_response' | 'task_list_update' | 'task_created' | 'task_updated' | 'task_deleted'
+  type: 'agent_response' | 'agent_response_chunk' | 'task_list_update' | 'task_created' | 'task_updated' | 'task_deleted' | 'error'
   response?: string
+  delta?: string
   conversation_history?: ChatMessage[]
   task?: Task
   task_id?: number